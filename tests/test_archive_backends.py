@@ -0,0 +1,86 @@
+import io
+import threading
+import time
+import urllib.error
+
+import pytest
+
+from tools.phase1 import archive_backends as ab
+
+
+class _Resp(io.BytesIO):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        pass
+
+
+def _http_error(code, retry_after=None):
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return urllib.error.HTTPError("https://web.archive.org/x", code, "err", headers, None)
+
+
+def test_snapshot_fetch_retries_429_then_succeeds(monkeypatch):
+    answers = [_http_error(429, "2"), _http_error(503), _Resp(b"<html>ok</html>")]
+    sleeps = []
+
+    def fake_urlopen(url, timeout=20):
+        a = answers.pop(0)
+        if isinstance(a, Exception):
+            raise a
+        return a
+
+    monkeypatch.setattr(ab.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(ab.time, "sleep", sleeps.append)
+    assert ab._fetch_snapshot_html("https://shop.example/p/1", "2024") == "<html>ok</html>"
+    assert sleeps[0] == 2.0  # Retry-After honoured
+    assert sleeps[1] >= ab.SNAPSHOT_BACKOFF_S * 2 * 0.75  # then exponential backoff
+
+
+def test_snapshot_fetch_gives_up_after_retries(monkeypatch):
+    calls = []
+
+    def fake_urlopen(url, timeout=20):
+        calls.append(url)
+        raise _http_error(429)
+
+    monkeypatch.setattr(ab.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(ab.time, "sleep", lambda s: None)
+    with pytest.raises(urllib.error.HTTPError):
+        ab._fetch_snapshot_html("https://shop.example/p/1", "2024")
+    assert len(calls) == ab.SNAPSHOT_RETRIES + 1
+
+
+def test_snapshot_fetch_does_not_retry_404(monkeypatch):
+    calls = []
+
+    def fake_urlopen(url, timeout=20):
+        calls.append(url)
+        raise _http_error(404)
+
+    monkeypatch.setattr(ab.urllib.request, "urlopen", fake_urlopen)
+    with pytest.raises(urllib.error.HTTPError):
+        ab._fetch_snapshot_html("https://shop.example/p/1", "2024")
+    assert len(calls) == 1
+
+
+def test_rescue_respects_workers_and_keeps_cdx_order(monkeypatch):
+    cdx = [{"original": f"https://shop.example/p/{i}", "timestamp": f"2024{i:04d}"} for i in range(6)]
+    live, peak, lock = [0], [0], threading.Lock()
+
+    def fake_fetch(original, ts):
+        with lock:
+            live[0] += 1
+            peak[0] = max(peak[0], live[0])
+        time.sleep(0.02)
+        with lock:
+            live[0] -= 1
+        i = original.rsplit("/", 1)[1]
+        return f"<html><h1>Olijfolie {i}</h1><span>€ {i},99</span></html>"
+
+    monkeypatch.setattr(ab, "_cdx_query_urls", lambda host, hints, limit: cdx[:limit])
+    monkeypatch.setattr(ab, "_fetch_snapshot_html", fake_fetch)
+    rows = ab.archive_pdp_rescue("https://shop.example/c", 6, ["olijf"], [], [], workers=2, rps=1000.0)
+    assert [r.source_url for r in rows] == [it["original"] for it in cdx]
+    assert peak[0] <= 2
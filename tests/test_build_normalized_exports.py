@@ -0,0 +1,180 @@
+import importlib
+import os
+import sqlite3
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def bne(tmp_path, monkeypatch):
+    """The module with its relative exports/ and data/ dirs under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    mod = importlib.import_module("tools.phase0.build_normalized_exports")
+    for p in (mod.EXPORTS, mod.DATA, mod.MANIFESTS):
+        p.mkdir(parents=True, exist_ok=True)
+    return mod
+
+
+def _canon(bne, n=4, run_id="R1", **row):
+    rows = [
+        dict(dict(chain="Albert Heijn", product_name=f"Olijfolie {i}", quantity="1 l", price_eur=f"{i + 5},99",
+                  retailer_code="ah_nl", country="NL", source_url=f"https://www.ah.nl/p/{i}",
+                  mode="live", robots_status="allowed", ean=None, sku=None), **row)
+        for i in range(n)
+    ]
+    df = pd.DataFrame(rows, dtype=object)
+    return bne.enrich_and_normalize(df, run_id)
+
+
+def _count(db, sql):
+    con = sqlite3.connect(db)
+    try:
+        return con.execute(sql).fetchone()[0]
+    finally:
+        con.close()
+
+
+def test_upsert_sqlite_leaves_journal_mode_alone(bne):
+    bne.upsert_sqlite(_canon(bne))
+    db = bne.DATA / "eopt.sqlite"
+    assert _count(db, "PRAGMA journal_mode") == "delete"
+    assert _count(db, "SELECT count(*) FROM prices") == 4
+    assert _count(db, "SELECT count(*) FROM websites") == 1
+
+
+def test_upsert_sqlite_is_one_transaction(bne, monkeypatch):
+    bne.upsert_sqlite(_canon(bne))
+    df = _canon(bne, run_id="R2")
+    df.loc[df.index[0], "website_id"] = "FR:new-site.fr"
+
+    def fail(frame):
+        raise RuntimeError("price insert failed")
+
+    monkeypatch.setattr(bne, "_sql_rows", fail)
+    with pytest.raises(RuntimeError):
+        bne.upsert_sqlite(df)
+    db = bne.DATA / "eopt.sqlite"
+    # the website inserted before the failure is rolled back with the prices
+    assert _count(db, "SELECT count(*) FROM websites WHERE website_id LIKE 'FR:%'") == 0
+    assert _count(db, "SELECT count(*) FROM prices") == 4
+
+
+def _qa_rows(df):
+    # the row-by-row QA sheet the vectorized one replaced
+    issues = []
+    for i, r in df.iterrows():
+        if not r.get("website_id"):
+            issues.append({"row": i, "issue": "website_id null", "source_url": r["source_url"], "retailer_code": r["retailer_code"]})
+        if r["unit_price_eur_per_l"] is not None and not (1 <= r["unit_price_eur_per_l"] <= 200):
+            issues.append({"row": i, "issue": "unit price out of bounds", "value": r["unit_price_eur_per_l"], "name": r["product_name"]})
+        if pd.isna(r["product_name"]) or str(r["product_name"]).strip() == "":
+            issues.append({"row": i, "issue": "missing product_name"})
+    return pd.DataFrame(issues)
+
+
+@pytest.mark.parametrize("edit", [
+    # blank and NaN unit prices, out-of-bounds prices, missing names and website_id
+    lambda df: df.assign(
+        unit_price_eur_per_l=[float("nan"), 0.5, 250.0, None, 6.99, float("nan")],
+        product_name=["Olijfolie 0", "", "Olijfolie 2", "  ", None, "Olijfolie 5"],
+        # object dtype, as enrich_and_normalize leaves it: missing ids are None
+        website_id=pd.Series(["NL:ah.nl", "NL:ah.nl", None, "NL:ah.nl", "NL:ah.nl", None], dtype=object, index=df.index),
+    ),
+    # one issue class only: just row and issue columns
+    lambda df: df.assign(product_name=["", "x", "x", None, "x", "x"]),
+    # no issues at all
+    lambda df: df,
+    lambda df: df.iloc[:0],
+])
+def test_qa_sheet_matches_row_by_row(bne, edit):
+    df = edit(_canon(bne, n=6))
+    pd.testing.assert_frame_equal(bne.qa_sheet(df), _qa_rows(df))
+
+
+def test_store_context_json_keeps_stdlib_format(bne):
+    df = _canon(bne, n=1)
+    ctx = df["store_context_json"].iat[0]
+    assert ctx == '{"website_id": "NL:ah.nl", "robots_status": "allowed", "mode": "live", "source_domain": "ah.nl"}'
+
+
+def _master_sheets(bne):
+    return pd.read_excel(bne.EXPORTS / "oils-prices_MASTER.xlsx", sheet_name=None)
+
+
+def _touch_older(path, than):
+    ns = than.stat().st_mtime_ns - 1_000_000_000
+    os.utime(path, ns=(ns, ns))
+
+
+def _sums_inputs(bne, monkeypatch):
+    """Row counts of every frame _country_chain_sums is asked to group."""
+    seen = []
+    real = bne._country_chain_sums
+    monkeypatch.setattr(bne, "_country_chain_sums", lambda df: seen.append(len(df)) or real(df))
+    return seen
+
+
+def _summary_rows(frame, cols):
+    return sorted(tuple(r) for r in frame[cols].itertuples(index=False))
+
+
+def test_master_summaries_carry_totals_forward(bne, monkeypatch):
+    pytest.importorskip("pyarrow")
+    runs = [
+        _canon(bne, 3, "R1"),
+        _canon(bne, 2, "R2", chain="Jumbo", retailer_code="jumbo_nl", ean="8710000000001"),
+        _canon(bne, 2, "R3"),
+    ]
+    seen = _sums_inputs(bne, monkeypatch)
+    for df in runs:
+        bne.write_weekly_master(df, df["run_id"].iat[0])
+    # after the first run only each new run is grouped, never the history
+    assert seen == [3, 2, 2]
+
+    sheets, everything = _master_sheets(bne), pd.concat(runs, ignore_index=True)
+    assert _summary_rows(sheets["Coverage"], ["country", "chain", "rows"]) == \
+        _summary_rows(bne.coverage(everything), ["country", "chain", "rows"])
+    piv_cols = ["country", "chain", "rows", "avg_price_eur", "id_rate"]
+    got = _summary_rows(sheets["Pivots_Country_Chain"], piv_cols)
+    want = _summary_rows(bne.pivot_country_chain(everything), piv_cols)
+    assert [g[:3] for g in got] == [w[:3] for w in want]
+    assert [g[3:] for g in got] == pytest.approx([w[3:] for w in want])
+
+
+def test_stale_master_sums_are_recounted(bne, monkeypatch):
+    pytest.importorskip("pyarrow")
+    bne.write_weekly_master(_canon(bne, 3, "R1"), "R1")
+    sums_pq = bne.EXPORTS / "oils-prices_MASTER_country_chain.parquet"
+    # totals older than the workbook (e.g. the workbook was rewritten elsewhere)
+    pd.DataFrame({"country": ["NL"], "chain": ["Albert Heijn"], "rows": [99], "sum_price": [0.0],
+                      "n_price": [0], "sum_has_id": [0]}).to_parquet(sums_pq, index=False)
+    _touch_older(sums_pq, bne.EXPORTS / "oils-prices_MASTER.xlsx")
+    seen = _sums_inputs(bne, monkeypatch)
+    bne.write_weekly_master(_canon(bne, 2, "R2"), "R2")
+    assert seen == [5]
+    assert _master_sheets(bne)["Coverage"]["rows"].tolist() == [5]
+
+
+
+def test_master_all_data_read_from_fresh_parquet_copy(bne):
+    pytest.importorskip("pyarrow")
+    bne.write_weekly_master(_canon(bne, 2, "R1"), "R1")
+    master_pq = bne.EXPORTS / "oils-prices_MASTER.parquet"
+    # a marker only the Parquet copy holds shows which source was appended to
+    copy = pd.read_parquet(master_pq)
+    copy.loc[0, "product_name"] = "from parquet"
+    copy.to_parquet(master_pq, index=False)
+    bne.write_weekly_master(_canon(bne, 1, "R2"), "R2")
+    names = _master_sheets(bne)["All_Data"]["product_name"].tolist()
+    assert names[0] == "from parquet" and len(names) == 3
+
+    # once older than the workbook, the copy is ignored
+    copy = pd.read_parquet(master_pq)
+    copy.loc[0, "product_name"] = "stale"
+    copy.to_parquet(master_pq, index=False)
+    _touch_older(master_pq, bne.EXPORTS / "oils-prices_MASTER.xlsx")
+    bne.write_weekly_master(_canon(bne, 1, "R3"), "R3")
+    names = _master_sheets(bne)["All_Data"]["product_name"].tolist()
+    assert names[0] == "from parquet" and len(names) == 4
@@ -0,0 +1,13 @@
+import pytest
+
+from tools.common import xpath_literal
+
+
+@pytest.mark.parametrize("name, lit", [
+    ("Colruyt Halle", "'Colruyt Halle'"),
+    ("Delhaize d'Ieper", '"Delhaize d\'Ieper"'),
+    ('Shop "X"', "'Shop \"X\"'"),
+    ("A'b \"c\"", "concat('A', \"'\", 'b \"c\"')"),
+])
+def test_xpath_literal_quotes_store_names(name, lit):
+    assert xpath_literal(name) == lit
@@ -0,0 +1,171 @@
+import io
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("tldextract")
+
+from tools.discovery import discover
+
+
+def test_token_bucket_paces_requests_across_threads():
+    bucket = discover._TokenBucket(rps=50.0, burst=1)
+    starts, lock = [], threading.Lock()
+
+    def worker():
+        for _ in range(3):
+            bucket.take()
+            with lock:
+                starts.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    starts.sort()
+    assert len(starts) == 12
+    # 12 requests at 50/s with a burst of 1 need at least 11 intervals
+    assert starts[-1] - starts[0] >= 11 / 50.0 * 0.9
+
+
+def test_session_requests_draw_from_shared_budget(monkeypatch):
+    taken = []
+    monkeypatch.setattr(discover.RATE, "take", lambda: taken.append(1))
+    monkeypatch.setattr(discover.requests.Session, "request", lambda self, *a, **k: "resp")
+    assert discover.SESSION.get("https://example.org/") == "resp"
+    assert discover.SESSION.post("https://example.org/", data={}) == "resp"
+    assert len(taken) == 2
+
+
+def test_main_reports_countries_in_cli_order(monkeypatch, tmp_path, capsys):
+    cfg = tmp_path / "cfg.yaml"
+    cfg.write_text("{}", encoding="utf-8")
+    delays = {"NL": 0.15, "BE": 0.0, "DE": 0.05}
+
+    def fake_discover(iso2, cfg, out_dir, week_tag, **kw):
+        time.sleep(delays[iso2])
+        return [{"country": iso2}], []
+
+    written = {}
+    monkeypatch.setattr(discover, "discover_country", fake_discover)
+    monkeypatch.setattr(discover, "write_diffs", lambda proposed, out: written.update(proposed))
+    monkeypatch.setattr("sys.argv", ["discover", "--countries", "nl", "be", "de",
+                                     "--config", str(cfg), "--out", str(tmp_path)])
+    discover.main()
+    lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith("[OK] ") and ":" in line]
+    assert [line.split()[1].rstrip(":") for line in lines] == ["NL", "BE", "DE"]
+    assert list(written) == ["NL", "BE", "DE"]
+
+
+class _Resp:
+    def __init__(self, status_code=200, text="", headers=None):
+        self.status_code, self.text, self.headers = status_code, text, headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def fetches(monkeypatch, tmp_path):
+    """Queue responses for SESSION.get; records the request headers of each call."""
+    queue, sent = [], []
+
+    def get(url, headers=None, **kw):
+        sent.append(dict(headers or {}))
+        return queue.pop(0)
+    monkeypatch.setattr(discover, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(discover.SESSION, "get", get)
+    return queue, sent
+
+
+def _fetch():
+    return discover._cached_fetch("ah.nl", "robots", "https://ah.nl/robots.txt", 4.0, lambda r: r.text)
+
+
+def _age_entry(seconds):
+    doc = discover._cache_load("ah.nl")
+    doc["robots"]["ts"] -= seconds
+    discover._cache_store("ah.nl", "robots", doc["robots"])
+
+
+def test_cached_fetch_miss_then_hit(fetches):
+    queue, sent = fetches
+    queue.append(_Resp(text="v1", headers={"ETag": '"e1"'}))
+    assert _fetch() == "v1"
+    assert _fetch() == "v1"
+    assert sent == [{}]
+    assert discover._cache_load("ah.nl")["robots"]["etag"] == '"e1"'
+
+
+def test_cached_fetch_revalidates_stale_entry_with_304(fetches):
+    queue, sent = fetches
+    queue.append(_Resp(text="v1", headers={"ETag": '"e1"', "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"}))
+    _fetch()
+    _age_entry(discover.CACHE_TTL_S + 1)
+    queue.append(_Resp(status_code=304))
+    assert _fetch() == "v1"
+    assert sent[1] == {"If-None-Match": '"e1"', "If-Modified-Since": "Mon, 05 Oct 2026 10:00:00 GMT"}
+    # the 304 refreshed the entry: no request for the next call
+    assert _fetch() == "v1" and len(sent) == 2
+
+
+def test_cached_fetch_replaces_stale_entry_on_200(fetches):
+    queue, sent = fetches
+    queue.append(_Resp(text="v1", headers={"ETag": '"e1"'}))
+    _fetch()
+    _age_entry(discover.CACHE_TTL_S + 1)
+    queue.append(_Resp(text="v2", headers={"ETag": '"e2"'}))
+    assert _fetch() == "v2"
+    assert discover._cache_load("ah.nl")["robots"]["etag"] == '"e2"'
+
+
+def test_cached_fetch_does_not_store_server_errors(fetches):
+    queue, sent = fetches
+    queue.extend([_Resp(status_code=503, text="down"), _Resp(text="v1")])
+    assert _fetch() == "down"
+    assert _fetch() == "v1"
+    assert len(sent) == 2
+
+
+def _page(body: bytes, encoding):
+    r = discover.requests.Response()
+    r.status_code, r.raw, r.encoding = 200, io.BytesIO(body), encoding
+    return r
+
+
+@pytest.mark.parametrize("body, encoding", [
+    # declared charset (requests' ISO-8859-1 default for text/html included)
+    ("<html><head><title> Caf\u00e9 &amp; Bar </title></head>".encode("cp1252"), "ISO-8859-1"),
+    ("<title>Boulangerie \u00e0 Li\u00e8ge</title>".encode("utf-8"), "utf-8"),
+    # no charset at all: guessed from the bytes, as apparent_encoding does
+    ("<html><head><TITLE>\u00c9picerie fine, cr\u00e8me br\u00fbl\u00e9e et p\u00e2tisserie</TITLE>".encode("utf-8"), None),
+    # long titles are kept whole
+    (("<title>" + "Olijfolie " * 40 + "</title>").encode("utf-8"), "utf-8"),
+])
+def test_parse_title_decodes_like_response_text(body, encoding):
+    bs4 = pytest.importorskip("bs4")
+    want = (bs4.BeautifulSoup(_page(body, encoding).text, "lxml").title or "").get_text(strip=True)
+    assert discover._parse_title(_page(body, encoding)) == want
+
+
+@pytest.mark.parametrize("status", [401, 403, 429])
+def test_cached_fetch_does_not_store_transient_refusals(fetches, status):
+    queue, sent = fetches
+    queue.extend([_Resp(status_code=status, text="<html>slow down</html>"), _Resp(text="v1")])
+    assert _fetch() == "<html>slow down</html>"
+    assert discover._cache_load("ah.nl") == {}
+    assert _fetch() == "v1"
+    assert len(sent) == 2
+
+
+def test_cached_fetch_stores_definitive_404(fetches):
+    queue, sent = fetches
+    queue.append(_Resp(status_code=404, text=""))
+    assert _fetch() == ""
+    assert _fetch() == ""
+    assert len(sent) == 1
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+
+from tools.phase1 import enrich_identifiers as ei
+
+
+class _Page:
+    def __init__(self, log):
+        self.log = log
+        self.url = None
+
+    async def goto(self, url, **kw):
+        self.log.append((url, time.monotonic()))
+        await asyncio.sleep(0.01)
+        if "broken" in url:
+            raise RuntimeError("navigation failed")
+        self.url = url
+
+    async def content(self):
+        i = self.url.rsplit("/", 1)[1]
+        ld = {"@type": "Product", "name": f"Olie {i}", "gtin13": f"87{i}", "sku": f"s{i}"}
+        return f'<script type="application/ld+json">{json.dumps(ld)}</script>'
+
+    async def close(self):
+        self.log.append(("closed", None))
+
+
+class _Context:
+    def __init__(self):
+        self.log = []
+        self.pages = 0
+
+    async def new_page(self):
+        self.pages += 1
+        return _Page(self.log)
+
+
+def _rows():
+    rows = [{"source_url": f"https://shop.example/p/{i}"} for i in range(6)]
+    rows.insert(2, {"source_url": "https://shop.example/broken/1"})
+    rows.append({"source_url": "https://shop.example/p/99", "ean": "already"})
+    return rows
+
+
+def _run(ctx, rows, **kw):
+    return asyncio.run(ei.enrich_identifiers(ctx, rows, **kw))
+
+
+def _no_jitter(monkeypatch):
+    monkeypatch.setattr(ei, "_sleep_jitter", lambda *a, **k: asyncio.sleep(0))
+
+
+def test_rows_enriched_in_order_when_one_page_fails(monkeypatch):
+    _no_jitter(monkeypatch)
+    ctx, rows = _Context(), _rows()
+    n = _run(ctx, rows)
+    visited = [u for u, _ in ctx.log if u != "closed"]
+    assert visited == [r["source_url"] for r in rows[:-1]]
+    assert n == 6
+    for r in rows[:-1]:
+        if "broken" in r["source_url"]:
+            assert "ean" not in r and "sku" not in r
+        else:
+            i = r["source_url"].rsplit("/", 1)[1]
+            assert (r["ean"], r["sku"]) == (f"87{i}", f"s{i}")
+    assert rows[-1] == {"source_url": "https://shop.example/p/99", "ean": "already"}
+    assert ctx.pages == ei.PDP_WORKERS
+    assert sum(1 for u, _ in ctx.log if u == "closed") == ctx.pages
+
+
+def test_rate_budget_spaces_page_loads(monkeypatch):
+    _no_jitter(monkeypatch)
+    ctx, rows = _Context(), _rows()[:4]
+    _run(ctx, rows, workers=4, rate_refill_per_s=20.0, rate_capacity=1)
+    starts = [t for u, t in ctx.log if u != "closed"]
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.04
@@ -0,0 +1,107 @@
+import json
+import os
+
+from tools.health import scan_backup_and_unblock as sbu
+from tools.health.scan_backup_and_unblock import EXPECTED_SELECTORS, check_selectors_json, scan_all
+
+
+def _write(root, data):
+    (root / "selectors.json").write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+
+
+def _complete():
+    return {code: dict(reqs) for code, reqs in EXPECTED_SELECTORS.items()}
+
+
+def test_complete_selectors_pass(tmp_path):
+    _write(tmp_path, _complete())
+    assert check_selectors_json(tmp_path)["ok"] is True
+
+
+def test_key_under_another_retailer_is_flagged(tmp_path):
+    data = _complete()
+    data["jumbo_nl"] = {}  # consent_accept_selector now only exists under ah_nl
+    _write(tmp_path, data)
+    res = check_selectors_json(tmp_path)
+    assert res["ok"] is False
+    assert any(i.startswith("jumbo_nl:") for i in res["issues"])
+
+
+def test_misnested_block_is_flagged(tmp_path):
+    data = _complete()
+    data["ah_nl"] = {"nested": data.pop("ah_nl")}
+    _write(tmp_path, data)
+    res = check_selectors_json(tmp_path)
+    assert res["ok"] is False
+    assert any(i.startswith("ah_nl:") for i in res["issues"])
+
+
+def test_invalid_json_is_flagged(tmp_path):
+    _write(tmp_path, json.dumps(_complete())[:-1])
+    res = check_selectors_json(tmp_path)
+    assert res["ok"] is False
+    assert "not parseable" in res["issues"][0]
+
+
+def _counted_scans(monkeypatch):
+    scanned = []
+    real = sbu._scan_one
+
+    def scan_one(f, need=None):
+        scanned.append(os.path.basename(f))
+        return real(f, need)
+    monkeypatch.setattr(sbu, "_scan_one", scan_one)
+    return scanned
+
+
+def _tree(root):
+    (root / "a.py").write_text("page.goto(url)\n", encoding="utf-8")
+    (root / "b.py").write_text("print('hi')\n", encoding="utf-8")
+    return [str(root / "a.py"), str(root / "b.py")]
+
+
+def test_scan_cache_reuses_unchanged_files(tmp_path, monkeypatch):
+    scanned = _counted_scans(monkeypatch)
+    files, db = _tree(tmp_path), tmp_path / "cache.sqlite"
+    groups = {"calls": ["page.goto", "print"]}
+    first = scan_all(files, groups, cache_db=db)
+    assert scan_all(files, groups, cache_db=db) == first
+    assert scanned == ["a.py", "b.py"]
+    assert first == {"calls": {"page.goto": [files[0]], "print": [files[1]]}}
+
+
+def test_scan_cache_rescans_edited_file_and_new_patterns(tmp_path, monkeypatch):
+    scanned = _counted_scans(monkeypatch)
+    files, db = _tree(tmp_path), tmp_path / "cache.sqlite"
+    scan_all(files, {"calls": ["page.goto"]}, cache_db=db)
+
+    (tmp_path / "b.py").write_text("page.goto(other)\n", encoding="utf-8")
+    st = os.stat(files[1])
+    os.utime(files[1], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    res = scan_all(files, {"calls": ["page.goto"]}, cache_db=db)
+    assert scanned == ["a.py", "b.py", "b.py"]
+    assert res["calls"]["page.goto"] == files
+
+    # a different pattern set invalidates every entry
+    scan_all(files, {"calls": ["page.goto", "print"]}, cache_db=db)
+    assert scanned[3:] == ["a.py", "b.py"]
+
+
+def test_scan_cache_skips_partial_first_hit_results(tmp_path, monkeypatch):
+    scanned = _counted_scans(monkeypatch)
+    files, db = _tree(tmp_path), tmp_path / "cache.sqlite"
+    groups = {"calls": ["page.goto"]}
+    scan_all(files, groups, first_hit=True, cache_db=db)
+    assert scanned == ["a.py"]
+    scan_all(files, groups, cache_db=db)
+    assert scanned == ["a.py", "a.py", "b.py"]
+
+
+def test_patterns_starting_at_the_same_position_are_all_reported(tmp_path):
+    # both match only at the same offset; the combined pass reports the first
+    f = tmp_path / "a.py"
+    f.write_text("x = archive_url\n", encoding="utf-8")
+    res = scan_all([str(f)], {"g": ["archive", "archive_url"]})
+    assert res == {"g": {"archive": [str(f)], "archive_url": [str(f)]}}
+    res = scan_all([str(f)], {"g": ["archive", "archive_url"]}, first_hit=True)
+    assert res["g"]["archive_url"] == [str(f)]
@@ -0,0 +1,64 @@
+import json
+import os
+
+from tools.health import scan_repo
+from tools.health.scan_repo import Issue, ScanState, write_reports
+
+
+def test_reports_sorted_by_severity_code_path_message(tmp_path):
+    issues = [
+        Issue("P2", "MANIFEST_YAML", "b broken", "manifests/b.yaml"),
+        Issue("P1", "MISSING_FILE", "retailers.csv missing", "retailers.csv"),
+        Issue("P2", "DISCOVERY_COLS", "z.csv missing columns", "discovery/z.csv"),
+        Issue("P2", "MANIFEST_YAML", "a broken", "manifests/b.yaml"),
+        Issue("P2", "MANIFEST_YAML", "a broken", "manifests/a.yaml"),
+    ]
+    json_path, txt_path = write_reports(tmp_path, issues, None)
+    got = [(i["severity"], i["code"], i["path"], i["message"])
+           for i in json.loads(json_path.read_text(encoding="utf-8"))["issues"]]
+    assert got == sorted(got)
+    # text report follows the same order
+    body = txt_path.read_text(encoding="utf-8")
+    assert body.index("z.csv missing") < body.index("[manifests/a.yaml]") < body.index("b broken")
+
+
+def _counting_check(calls):
+    def check(p):
+        calls.append(p.name)
+        return [Issue("P2", "MANIFEST_GATES", "Missing 'gates' section", str(p))], None
+    return check
+
+
+def test_scan_state_rechecks_edited_manifest(tmp_path):
+    mf = tmp_path / "manifests" / "nl.yaml"
+    mf.parent.mkdir()
+    mf.write_text("country: NL\n", encoding="utf-8")
+    calls = []
+    check = _counting_check(calls)
+
+    state = ScanState(tmp_path / "state.json")
+    state.cached(mf, check)
+    state.save()
+    found, _ = ScanState(tmp_path / "state.json").cached(mf, check)
+    assert calls == ["nl.yaml"] and found[0].code == "MANIFEST_GATES"
+
+    mf.write_text("country: NL\ngates: {}\n", encoding="utf-8")
+    st = mf.stat()
+    os.utime(mf, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    ScanState(tmp_path / "state.json").cached(mf, check)
+    assert calls == ["nl.yaml", "nl.yaml"]
+
+
+def test_scan_state_dropped_when_rules_change(tmp_path, monkeypatch):
+    mf = tmp_path / "nl.yaml"
+    mf.write_text("country: NL\n", encoding="utf-8")
+    calls = []
+    state = ScanState(tmp_path / "state.json")
+    state.cached(mf, _counting_check(calls))
+    state.save()
+
+    monkeypatch.setattr(scan_repo, "_CLASSES", scan_repo._CLASSES | {"discounter"})
+    state = ScanState(tmp_path / "state.json")
+    assert state.entries == {}
+    state.cached(mf, _counting_check(calls))
+    assert calls == ["nl.yaml", "nl.yaml"]
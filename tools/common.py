@@ -0,0 +1,61 @@
+# tools/common.py
+"""Small helpers shared by the tools/ scripts."""
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+# ---- optional fast JSON (falls back to stdlib)
+try:
+    import orjson
+
+    def json_loads(s):
+        """Parse JSON from str or bytes."""
+        return orjson.loads(s)
+
+    def json_dumps_pretty(obj) -> bytes:
+        """Indented UTF-8 JSON (non-ASCII kept as-is; non-str keys allowed)."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except Exception:
+    def json_loads(s):
+        """Parse JSON from str or bytes."""
+        return json.loads(s)
+
+    def json_dumps_pretty(obj) -> bytes:
+        """Indented UTF-8 JSON (non-ASCII kept as-is; non-str keys allowed)."""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+# ---- presence checks from memoized directory listings
+@lru_cache(maxsize=None)
+def _listing(d: str) -> Optional[frozenset]:
+    try:
+        with os.scandir(d) as it:
+            return frozenset(e.name for e in it)
+    except OSError:
+        return None
+
+def dir_names(d: Union[str, Path]) -> Optional[frozenset]:
+    """Entry names in d from one os.scandir (memoized for the process), or
+    None if it cannot be listed."""
+    return _listing(os.fspath(d))
+
+def path_exists(p: Union[str, Path]) -> bool:
+    """Membership in the parent's memoized listing instead of a stat per path;
+    falls back to os.path.exists when the parent cannot be listed."""
+    head, tail = os.path.split(os.fspath(p))
+    names = _listing(head)
+    return os.path.exists(p) if names is None else tail in names
+
+# ---- XPath
+def xpath_literal(s: str) -> str:
+    """s as an XPath 1.0 string literal. XPath has no escapes, so a string
+    holding both quote kinds is built with concat()."""
+    if "'" not in s:
+        return f"'{s}'"
+    if '"' not in s:
+        return f'"{s}"'
+    return "concat('" + "', \"'\", '".join(s.split("'")) + "')"
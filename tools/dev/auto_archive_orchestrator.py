@@ -1,7 +1,7 @@
 # tools/dev/auto_archive_orchestrator.py
 from __future__ import annotations
 import csv
-import json
+import io
 import os
 import re
 import shutil
@@ -12,6 +12,14 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
+# --- import shim so "tools.*" works when run directly ---
+_root = Path(__file__).resolve().parents[2]  # project root
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+# -------------------------------------------------------
+
+from tools.common import json_dumps_pretty, json_loads
+
 # ---------- Constants ----------
 ROOT = Path(".").resolve()
 RETAILERS_CSV = ROOT / "retailers.csv"
@@ -21,6 +29,7 @@ PHASE1_FILE = ROOT / "tools/phase1/phase1_oilbot.py"
 DEFAULT_PROVIDERS = "wayback,archive_today,ghost,memento,commoncrawl"
 DEFAULT_LOOKBACK_DAYS = "60"
 DEFAULT_MAX_PAGES = "6"
+CSV_IO_BUFFER = 1 << 17  # 128 KiB: fewer read()/write() syscalls on the retailers.csv round-trips
 
 RUN_CMD = [
     sys.executable, "-m", "eopt.cli", "run",
@@ -57,18 +66,25 @@ class TargetResult:
 def _read_csv(fp: Path) -> Tuple[List[str], List[Dict[str, str]]]:
     if not fp.exists():
         raise FileNotFoundError(f"retailers.csv not found at {fp}")
-    with fp.open("r", encoding="utf-8", newline="") as f:
+    with fp.open("r", encoding="utf-8", newline="", buffering=CSV_IO_BUFFER) as f:
         rdr = csv.DictReader(f)
         rows = list(rdr)
         return list(rdr.fieldnames or []), rows
 
 def _write_csv(fp: Path, fieldnames: List[str], rows: List[Dict[str, str]]) -> None:
     fp.parent.mkdir(parents=True, exist_ok=True)
-    with fp.open("w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for r in rows:
-            w.writerow({k: r.get(k, "") for k in fieldnames})
+    with fp.open("w", encoding="utf-8", newline="", buffering=CSV_IO_BUFFER) as f:
+        w = csv.writer(f)
+        w.writerow(fieldnames)
+        w.writerows([r.get(k, "") for k in fieldnames] for r in rows)
+
+def _render_csv(fieldnames: List[str], rows: List[Dict[str, str]]) -> bytes:
+    """Serialize rows exactly as _write_csv would, without touching disk."""
+    buf = io.StringIO(newline="")
+    w = csv.writer(buf)
+    w.writerow(fieldnames)
+    w.writerows([r.get(k, "") for k in fieldnames] for r in rows)
+    return buf.getvalue().encode("utf-8")
 
 def _ensure_cols(fieldnames: List[str], rows: List[Dict[str, str]], needed: List[str]) -> Tuple[List[str], List[Dict[str, str]], bool]:
     changed = False
@@ -216,7 +232,7 @@ def _parse_stdout(stdout: str) -> Dict[str, TargetResult]:
         mm = RE_METRICS.search(line)
         if mm:
             try:
-                metrics = json.loads(mm.group(1))
+                metrics = json_loads(mm.group(1))
             except Exception:
                 metrics = {}
             if results:
@@ -234,23 +250,25 @@ def _save_report(run_id: str, countries: List[str], mode: str, targets: List[str
     txt = REPORTS_DIR / f"{base}.txt"
     jsn = REPORTS_DIR / f"{base}.json"
 
-    lines = []
-    lines.append(f"[ORCH] run_id={run_id} countries={countries} mode={mode} targets={targets}")
-    lines.append("")
-    for t in targets:
-        r = results.get(t)
-        if not r:
-            lines.append(f"- {t}: NO PARSED OUTPUT")
-            continue
-        lines.append(f"- {t}: rows={r.info_rows} why_flip={r.why_flip} archive_tries={r.archive_tries} archive_success={r.archive_success} fallbacks={r.archive_fallbacks}")
-    r0 = next(iter(results.values())) if results else None
-    if r0 and r0.metrics:
-        lines.append("")
-        lines.append("[METRICS]")
-        for k, v in r0.metrics.items():
-            lines.append(f"  {k}: {v}")
-    lines.append("\n[RAW]\n" + stdout)
-    txt.write_text("\n".join(lines), encoding="utf-8")
+    # Stream the summary + raw stdout straight to disk; joining first would hold a second
+    # full copy of stdout in memory.
+    with txt.open("w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(f"[ORCH] run_id={run_id} countries={countries} mode={mode} targets={targets}\n")
+        f.write("\n")
+        for t in targets:
+            r = results.get(t)
+            if not r:
+                f.write(f"- {t}: NO PARSED OUTPUT\n")
+                continue
+            f.write(f"- {t}: rows={r.info_rows} why_flip={r.why_flip} archive_tries={r.archive_tries} archive_success={r.archive_success} fallbacks={r.archive_fallbacks}\n")
+        r0 = next(iter(results.values())) if results else None
+        if r0 and r0.metrics:
+            f.write("\n")
+            f.write("[METRICS]\n")
+            for k, v in r0.metrics.items():
+                f.write(f"  {k}: {v}\n")
+        f.write("\n[RAW]\n")
+        f.write(stdout)
 
     out = {
         "run_id": run_id,
@@ -260,7 +278,7 @@ def _save_report(run_id: str, countries: List[str], mode: str, targets: List[str
         "results": {k: v.to_dict() for k, v in results.items()},
         "raw_path": str(txt),
     }
-    jsn.write_text(json.dumps(out, indent=2), encoding="utf-8")
+    jsn.write_bytes(json_dumps_pretty(out))
     return txt, jsn
 
 # ---------- Main ----------
@@ -292,12 +310,14 @@ def main(argv: List[str]) -> int:
     fields, rows, added_cols = _ensure_cols(fields, rows, needed_cols)
     changed_defaults = _set_defaults_for_targets(rows, targets)
 
-    # Backup and write if changed
+    # Backup and write if changed. The flags above also fire when only the in-memory dicts
+    # were normalized, so compare the serialized bytes before touching disk.
     bk_path = None
-    if added_cols or changed_defaults:
+    new_csv_bytes = _render_csv(fields, rows) if (added_cols or changed_defaults) else None
+    if new_csv_bytes is not None and new_csv_bytes != RETAILERS_CSV.read_bytes():
         bk_path = RETAILERS_CSV.with_suffix(".bak")
         shutil.copy2(RETAILERS_CSV, bk_path)
-        _write_csv(RETAILERS_CSV, fields, rows)
+        RETAILERS_CSV.write_bytes(new_csv_bytes)
         if args.print_retailers_change:
             print(f"[OK] retailers.csv updated. added_cols={added_cols} changed_defaults={changed_defaults} | backup={bk_path}")
     else:
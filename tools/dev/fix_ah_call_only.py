@@ -37,10 +37,10 @@ def main():
         f'{indent}    {original_line}\n'
     )
 
-    bkdir = ROOT / f"backups/ah_call_fix_{dt.datetime.now().strftime("%Y%m%d-%H%M%S")}"
+    bkdir = ROOT / f"backups/ah_call_fix_{dt.datetime.now().strftime('%Y%m%d-%H%M%S')}"
     backup(PHASE1, bkdir)
 
-    new_txt = txt[:m.start()] + replacement + txt[m.end():]
+    new_txt = "".join((txt[:m.start()], replacement, txt[m.end():]))
     PHASE1.write_text(new_txt, encoding="utf-8")
     print(f"[OK] Patched AH call. Backup → {bkdir}")
 
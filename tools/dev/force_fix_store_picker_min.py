@@ -1,5 +1,5 @@
 ﻿from __future__ import annotations
-import sys, shutil, datetime as dt
+import re, sys, shutil, datetime as dt
 from pathlib import Path
 
 ROOT   = Path(".").resolve()
@@ -15,28 +15,24 @@ MIN_BLOCK = (
     "            page.click(open_selector)\\n"
     "    except Exception:\\n"
     "        pass\\n"
+    "    from tools.common import xpath_literal\\n"
+    "    lit = xpath_literal(store_name)\\n"
     "    try:\\n"
     "        inp = page.query_selector('input[role=\"combobox\"], input[type=\"search\"], input[type=\"text\"]')\\n"
     "        if inp:\\n"
     "            inp.fill(store_name)\\n"
     "            page.wait_for_timeout(500)\\n"
     "            # First matching option by visible text (li/div/button/a)\\n"
-    "            opt = (\\n"
-    "                page.query_selector(\"//li[contains(normalize-space(.), '\" + store_name + \"')]\")\\n"
-    "                or page.query_selector(\"//div[contains(normalize-space(.), '\" + store_name + \"')]\")\\n"
-    "                or page.query_selector(\"//button[contains(normalize-space(.), '\" + store_name + \"')]\")\\n"
-    "                or page.query_selector(\"//a[contains(normalize-space(.), '\" + store_name + \"')]\")\\n"
-    "            )\\n"
-    "            if opt:\\n"
-    "                opt.click()\\n"
+    "            tags = 'self::li or self::div or self::button or self::a'\\n"
     "        else:\\n"
-    "            opt = (\\n"
-    "                page.query_selector(\"//button[contains(normalize-space(.), '\" + store_name + \"')]\")\\n"
-    "                or page.query_selector(\"//a[contains(normalize-space(.), '\" + store_name + \"')]\")\\n"
-    "                or page.query_selector(\"//div[contains(normalize-space(.), '\" + store_name + \"')]\")\\n"
-    "            )\\n"
-    "            if opt:\\n"
-    "                opt.click()\\n"
+    "            tags = 'self::button or self::a or self::div'\\n"
+    "        # One XPath union = one browser round-trip; innermost match wins\\n"
+    "        opt = page.query_selector(\\n"
+    "            f'xpath=//*[{tags}][contains(normalize-space(.), {lit})]'\\n"
+    "            f'[not(.//*[{tags}][contains(normalize-space(.), {lit})])]'\\n"
+    "        )\\n"
+    "        if opt:\\n"
+    "            opt.click()\\n"
     "        if confirm_selector:\\n"
     "            page.click(confirm_selector, timeout=timeout_ms)\\n"
     "        page.wait_for_timeout(1200)\\n"
@@ -49,58 +45,59 @@ def backup(fp: Path, bkdir: Path):
     bkdir.mkdir(parents=True, exist_ok=True)
     shutil.copy2(fp, bkdir / (fp.name + ".bak"))
 
+RX_BLOCK_DEF = re.compile(r"^([ \t]*)def _ensure_store_selected\(", re.MULTILINE)
+
 def remove_existing_block(txt: str) -> str:
-    lines = txt.splitlines(True)
-    start = None
-    for i, line in enumerate(lines):
-        if line.lstrip().startswith("def _ensure_store_selected("):
-            start = i
-            break
-    if start is None:
+    # Locate the def and the next def at the same or shallower indent directly in the
+    # text; no per-line split/strip of the whole file.
+    m = RX_BLOCK_DEF.search(txt)
+    if not m:
         return txt  # nothing to remove
 
-    start_indent = len(lines[start]) - len(lines[start].lstrip(" \t"))
-    end = len(lines)
-    for j in range(start + 1, len(lines)):
-        s = lines[j].lstrip(" \t")
-        indent = len(lines[j]) - len(s)
-        if s.startswith("def ") and indent <= start_indent:
-            end = j
-            break
-    return "".join(lines[:start] + lines[end:])
+    start = m.start()
+    start_indent = len(m.group(1))
+    body_at = txt.find("\n", m.end())
+    if body_at < 0:
+        return txt[:start]
+    nxt = re.compile(r"^[ \t]{0,%d}def " % start_indent, re.MULTILINE).search(txt, body_at + 1)
+    end = nxt.start() if nxt else len(txt)
+    return txt[:start] + txt[end:]
 
 def insert_after_imports(txt: str, block: str) -> str:
-    lines = txt.splitlines(True)
-    last_imp_idx = -1
-    for idx, line in enumerate(lines):
+    # Track the character offset just past the last import line while scanning, so the
+    # insert is a single join of three slices rather than a rebuilt list of lines.
+    offset = 0
+    insert_at = -1
+    for line in txt.splitlines(True):
+        offset += len(line)
         s = line.lstrip()
         if s.startswith("import ") or (s.startswith("from ") and " import " in s):
-            last_imp_idx = idx
-    if last_imp_idx >= 0:
-        insert_pos = last_imp_idx + 1
-        return "".join(lines[:insert_pos] + ["\n", block, "\n"] + lines[insert_pos:])
+            insert_at = offset
+    if insert_at >= 0:
+        return "".join((txt[:insert_at], "\n", block, "\n", txt[insert_at:]))
     return block + "\n\n" + txt
 
 def main():
     if not PHASE1.exists():
         print("[ERR] Missing {}".format(PHASE1)); sys.exit(1)
 
-    bkdir = ROOT / "backups/force_fix_store_picker_{}".format(dt.datetime.now().strftime("%Y%m%d-%H%M%S"))
-    backup(PHASE1, bkdir)
-
     original = PHASE1.read_text(encoding="utf-8", errors="ignore")
     stripped  = remove_existing_block(original)
     patched   = insert_after_imports(stripped, MIN_BLOCK)
+    changed   = patched != original
 
-    if patched != original:
-        PHASE1.write_text(patched, encoding="utf-8")
-        print("[OK] Wrote minimal _ensure_store_selected(). Backup → {}".format(bkdir))
-    else:
-        print("[OK] No change made (already minimal/clean). Backup → {}".format(bkdir))
+    if not changed:
+        print("[OK] No change made (already minimal/clean).")
+        return
+
+    bkdir = ROOT / "backups/force_fix_store_picker_{}".format(dt.datetime.now().strftime("%Y%m%d-%H%M%S"))
+    backup(PHASE1, bkdir)
+    PHASE1.write_text(patched, encoding="utf-8")
+    print("[OK] Wrote minimal _ensure_store_selected(). Backup → {}".format(bkdir))
 
-    # Syntax check
+    # Syntax check (only needed when we actually rewrote the file)
     try:
-        compile(PHASE1.read_text(encoding="utf-8"), str(PHASE1), "exec")
+        compile(patched, str(PHASE1), "exec")
         print("[OK] phase1_oilbot.py syntax is valid.")
     except SyntaxError as e:
         print("[ERR] SyntaxError after patch: {}".format(e)); sys.exit(2)
@@ -21,6 +21,8 @@ def _ensure_store_selected(
     except Exception:
         # Modal might be already open or store already selected.
         pass
+    from tools.common import xpath_literal
+    lit = xpath_literal(store_name)
     try:
         # Try common textbox/combobox inputs first
         inp = page.query_selector('input[role="combobox"], input[type="search"], input[type="text"]')
@@ -28,23 +30,17 @@ def _ensure_store_selected(
             inp.fill(store_name)
             page.wait_for_timeout(500)
             # first matching option by text (li/div/button/a)
-            opt = (
-                page.query_selector(f'//li[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//div[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//button[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//a[contains(normalize-space(.), "{store_name}")]')
-            )
-            if opt:
-                opt.click()
+            tags = "self::li or self::div or self::button or self::a"
         else:
             # Direct clickable entry without textbox
-            opt = (
-                page.query_selector(f'//button[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//a[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//div[contains(normalize-space(.), "{store_name}")]')
-            )
-            if opt:
-                opt.click()
+            tags = "self::button or self::a or self::div"
+        # Single XPath union (one browser round-trip); innermost match wins over wrappers.
+        opt = page.query_selector(
+            f"xpath=//*[{tags}][contains(normalize-space(.), {lit})]"
+            f"[not(.//*[{tags}][contains(normalize-space(.), {lit})])]"
+        )
+        if opt:
+            opt.click()
 
         if confirm_selector:
             page.click(confirm_selector, timeout=timeout_ms)
@@ -59,7 +55,7 @@ def backup(fp: Path, bkdir: Path):
     bkdir.mkdir(parents=True, exist_ok=True)
     shutil.copy2(fp, bkdir / (fp.name + ".bak"))
 
-def patch_file(fp: Path) -> bool:
+def patch_file(fp: Path, bkdir: Path) -> bool:
     txt = fp.read_text(encoding="utf-8", errors="ignore")
 
     # If the function is syntactically present and *looks* okay, skip.
@@ -81,6 +77,7 @@ def patch_file(fp: Path) -> bool:
             new = GOOD_BLOCK + "\n\n" + txt
 
     if new != txt:
+        backup(fp, bkdir)
         fp.write_text(new, encoding="utf-8")
         return True
     return False
@@ -89,14 +86,13 @@ def main():
     if not PHASE1.exists():
         print(f"[ERR] Missing {PHASE1}"); sys.exit(1)
     bkdir = ROOT / f"backups/repair_store_picker_{dt.datetime.now().strftime('%Y%m%d-%H%M%S')}"
-    backup(PHASE1, bkdir)
-    changed = patch_file(PHASE1)
+    changed = patch_file(PHASE1, bkdir)
     if not changed:
         print("[OK] No change needed (function already good).")
-    else:
-        print(f"[OK] Replaced _ensure_store_selected(). Backup → {bkdir}")
+        return
+    print(f"[OK] Replaced _ensure_store_selected(). Backup → {bkdir}")
 
-    # quick syntax check
+    # quick syntax check (skipped above when the file was left untouched)
     try:
         compile(PHASE1.read_text(encoding="utf-8"), str(PHASE1), "exec")
         print("[OK] phase1_oilbot.py syntax is valid.")
@@ -1,58 +1,66 @@
 #!/usr/bin/env python3
 from pathlib import Path
-import csv, shutil
+import csv, os, shutil, tempfile
 
 CSV_CANDIDATES = [
     "retailers/retailers.csv",
     "retailers/registry.csv",
     "retailers.csv",
 ]
+CSV_IO_BUFFER = 1 << 20
 
-def read_rows(p: Path):
+def first_existing(paths):
+    # one stat() per candidate; no realpath() on the misses
+    for p in paths:
+        try:
+            os.stat(p)
+        except OSError:
+            continue
+        return Path(p)
+    return None
+
+def read_headers(p: Path):
     with p.open("r", encoding="utf-8", errors="ignore", newline="") as f:
-        r = csv.DictReader(f)
-        headers = r.fieldnames or []
-        rows = [dict(x) for x in r]
-    return headers, rows
-
-def write_rows(p: Path, headers, rows):
-    with p.open("w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=headers)
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+        return next(csv.reader(f), [])
+
+def add_retailer_column(p: Path, headers):
+    """Stream rows into a sibling temp file with the new column filled, then swap it in."""
+    # Prefer to mirror from 'code' if present.
+    code_header = next((h for h in headers if h.lower()=="code"), None)
+    new_headers = headers[:] + ["retailer"]
+    with p.open("r", encoding="utf-8", errors="ignore", newline="", buffering=CSV_IO_BUFFER) as fin, \
+         tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", buffering=CSV_IO_BUFFER,
+                                     dir=p.parent, suffix=".tmp", delete=False) as fout:
+        try:
+            w = csv.DictWriter(fout, fieldnames=new_headers)
+            w.writeheader()
+            for r in csv.DictReader(fin):
+                r["retailer"] = r.get(code_header, r.get("retailer", "")) if code_header else r.get("retailer","")
+                w.writerow(r)
+        except Exception:
+            fout.close()
+            os.unlink(fout.name)
+            raise
+    shutil.copymode(p, fout.name)
+    os.replace(fout.name, p)
 
 def main():
-    root = Path(".").resolve()
-    target = None
-    for c in CSV_CANDIDATES:
-        p = (root / c).resolve()
-        if p.exists():
-            target = p
-            break
+    target = first_existing(CSV_CANDIDATES)
     if not target:
         print("No retailers.csv found in common locations.")
         return 1
 
-    headers, rows = read_rows(target)
+    headers = read_headers(target)
 
     # If 'retailer' already present, nothing to do.
     if any(h.lower() == "retailer" for h in headers):
         print(f"[OK] {target.name} already has 'retailer' column.")
         return 0
 
-    # Prefer to mirror from 'code' if present.
-    code_header = next((h for h in headers if h.lower()=="code"), None)
-    new_headers = headers[:] + ["retailer"]
-
-    # Fill new column
-    for r in rows:
-        r["retailer"] = r.get(code_header, r.get("retailer", "")) if code_header else r.get("retailer","")
-
-    # Backup then write
+    # Backup then rewrite
     backup = target.with_suffix(target.suffix + ".bak")
     shutil.copyfile(target, backup)
-    write_rows(target, new_headers, rows)
+    add_retailer_column(target, headers)
 
     print(f"[UPDATED] Added 'retailer' column to {target}\n[Backup] -> {backup}")
     return 0
@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
-import json, shutil
+import os, shutil, sys
+from collections import deque
 from pathlib import Path
 
+# --- import shim so "tools.*" works when run directly ---
+_root = Path(__file__).resolve().parents[2]  # project root
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+# -------------------------------------------------------
+
+from tools.common import json_dumps_pretty, json_loads
+
 PATHS = [
     "selectors.json",
     "retailers/selectors.json",
@@ -32,21 +41,33 @@ REQUIRED = {
 }
 
 def first_existing():
+    # one stat() per candidate; no realpath() on the misses
     for p in PATHS:
-        q = Path(p).resolve()
-        if q.exists():
-            return q
+        try:
+            os.stat(p)
+        except OSError:
+            continue
+        return Path(p)
     return None
 
-def deep_fill(dst: dict, src: dict):
-    for k, v in src.items():
-        if isinstance(v, dict):
-            if k not in dst or not isinstance(dst.get(k), dict):
-                dst[k] = {}
-            deep_fill(dst[k], v)
-        else:
-            if k not in dst or dst[k] in (None, "", []):
-                dst[k] = v
+def deep_fill(dst: dict, src: dict) -> bool:
+    """Fill missing/empty keys of dst from src in place; return True if dst changed."""
+    # Explicit work stack instead of recursion: no frame per nesting level and no
+    # recursion-limit ceiling on deeply nested selector files.
+    changed = False
+    stack = deque([(dst, src)])
+    while stack:
+        d, s = stack.pop()
+        for k, v in s.items():
+            if isinstance(v, dict):
+                if k not in d or not isinstance(d.get(k), dict):
+                    d[k] = {}
+                    changed = True
+                stack.append((d[k], v))
+            elif k not in d or (d[k] in (None, "", []) and d[k] != v):
+                d[k] = v
+                changed = True
+    return changed
 
 def main():
     target = first_existing()
@@ -55,24 +76,25 @@ def main():
         return 1
     raw = target.read_text(encoding="utf-8", errors="ignore")
     try:
-        data = json.loads(raw) if raw.strip() else {}
+        data = json_loads(raw) if raw.strip() else {}
     except Exception:
         print(f"Could not parse JSON at {target}")
         return 1
 
-    before = json.dumps(data, sort_keys=True)
+    changed = False
     for retailer, req in REQUIRED.items():
-        data.setdefault(retailer, {})
-        deep_fill(data[retailer], req)
-    after = json.dumps(data, sort_keys=True)
+        if retailer not in data:
+            data[retailer] = {}
+            changed = True
+        changed |= deep_fill(data[retailer], req)
 
-    if before == after:
+    if not changed:
         print(f"[OK] selectors already contain required keys for AH/Jumbo/Carrefour/Colruyt.\n-> {target}")
         return 0
 
     backup = target.with_suffix(target.suffix + ".bak")
     shutil.copyfile(target, backup)
-    target.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    target.write_bytes(json_dumps_pretty(data))
     print(f"[UPDATED] {target}\n[Backup] -> {backup}")
     return 0
 
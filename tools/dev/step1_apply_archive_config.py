@@ -1,5 +1,5 @@
 from __future__ import annotations
-import csv, json, sys
+import csv, os, shutil, sys, tempfile
 from pathlib import Path
 
 ROOT = Path(".").resolve()
@@ -7,6 +7,15 @@ CSV_PATH = ROOT / "retailers.csv"
 SEL_PATH = ROOT / "selectors.json"
 
 REQUIRED_COLS = ["archive_priority", "prefer_archive"]
+CSV_IO_BUFFER = 1 << 20
+
+# --- import shim so "tools.*" works when run directly ---
+_root = Path(__file__).resolve().parents[2]  # project root
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+# -------------------------------------------------------
+
+from tools.common import json_dumps_pretty, json_loads
 
 # sensible global defaults
 GLOBAL_PRIORITY = ["wayback","ghost","memento","arquivo","ukwa","archivetoday"]
@@ -27,55 +36,83 @@ def ensure_csv_columns():
         print(f"[ERR] retailers.csv not found at {CSV_PATH}")
         sys.exit(1)
 
-    rows = []
-    with CSV_PATH.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        fieldnames = list(reader.fieldnames or [])
-        rows = list(reader)
-
+    # Single streaming pass: read a row, fix it up, write it to a sibling temp file, then
+    # swap the temp file in (or drop it if nothing changed). Memory stays bounded by one row.
+    added_cols = False
     changed = False
-    for col in REQUIRED_COLS:
-        if col not in fieldnames:
-            fieldnames.append(col)
-            changed = True
-
-    # fill defaults for new cols; apply PINNED overrides by code
-    for r in rows:
-        for col in REQUIRED_COLS:
-            if r.get(col, "") == "":
-                r[col] = DEFAULT_PREFER if col == "prefer_archive" else DEFAULT_PRIORITY
-        code = (r.get("code") or "").strip()
-        if code in PINNED:
-            r.update(PINNED[code])
+    n_rows = 0
+    with CSV_PATH.open("r", encoding="utf-8", newline="", buffering=CSV_IO_BUFFER) as fin, \
+         tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", buffering=CSV_IO_BUFFER,
+                                     dir=CSV_PATH.parent, suffix=".tmp", delete=False) as fout:
+        try:
+            reader = csv.DictReader(fin)
+            fieldnames = list(reader.fieldnames or [])
+            for col in REQUIRED_COLS:
+                if col not in fieldnames:
+                    fieldnames.append(col)
+                    added_cols = changed = True
 
-    # write back only if needed (or always to be explicit)
-    with CSV_PATH.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+            writer = csv.DictWriter(fout, fieldnames=fieldnames)
+            writer.writeheader()
+            # fill defaults for new cols; apply PINNED overrides by code
+            for r in reader:
+                for col in REQUIRED_COLS:
+                    if r.get(col, "") == "":
+                        r[col] = DEFAULT_PREFER if col == "prefer_archive" else DEFAULT_PRIORITY
+                        changed = True
+                pins = PINNED.get((r.get("code") or "").strip())
+                if pins and any(r.get(k) != v for k, v in pins.items()):
+                    r.update(pins)
+                    changed = True
+                writer.writerow(r)
+                n_rows += 1
+        except Exception:
+            fout.close()
+            os.unlink(fout.name)
+            raise
+    if not changed:
+        os.unlink(fout.name)
+        print(f"[OK] retailers.csv already up to date. rows={n_rows}")
+        return
+    shutil.copymode(CSV_PATH, fout.name)
+    os.replace(fout.name, CSV_PATH)
 
-    print(f"[OK] retailers.csv updated. added_cols={changed} rows={len(rows)}")
+    print(f"[OK] retailers.csv updated. added_cols={added_cols} rows={n_rows}")
 
 def ensure_selectors_archives():
     # load or create selectors.json
+    changed = False
     if SEL_PATH.exists():
         try:
-            data = json.loads(SEL_PATH.read_text(encoding="utf-8"))
+            data = json_loads(SEL_PATH.read_bytes())
         except Exception:
             print("[WARN] selectors.json invalid JSON; recreating minimal file.")
             data = {}
+            changed = True
     else:
         data = {}
+        changed = True
 
     archives = data.get("archives", {})
     # set only if missing (so we don't clobber future tweaks)
-    archives.setdefault("global_priority", GLOBAL_PRIORITY)
-    archives.setdefault("timeout_ms", 5000)
-    archives.setdefault("bad_day_threshold", 2)
-    archives.setdefault("cooldowns", {"unlock_hours": 12})
-    data["archives"] = archives
+    defaults = {
+        "global_priority": GLOBAL_PRIORITY,
+        "timeout_ms": 5000,
+        "bad_day_threshold": 2,
+        "cooldowns": {"unlock_hours": 12},
+    }
+    for k, v in defaults.items():
+        if k not in archives:
+            archives[k] = v
+            changed = True
+    if "archives" not in data:
+        data["archives"] = archives
+        changed = True
 
-    SEL_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    if not changed:
+        print(f"[OK] selectors.json archives section already present at {SEL_PATH}")
+        return
+    SEL_PATH.write_bytes(json_dumps_pretty(data))
     print(f"[OK] selectors.json archives section ensured at {SEL_PATH}")
 
 def main():
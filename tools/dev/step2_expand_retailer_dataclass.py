@@ -5,6 +5,11 @@ from pathlib import Path
 ROOT = Path(".").resolve()
 PHASE1 = ROOT / "tools/phase1/phase1_oilbot.py"
 
+# Precompiled patterns
+_RE_RETAILER = re.compile(r"@dataclass\s*[\r\n]+class\s+Retailer\s*:\s*(?P<body>[\s\S]+?)(?=^[^\s#]|\Z)", re.MULTILINE)
+_RE_FIELD = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*:", re.MULTILINE)
+_RE_DEF = re.compile(r"\n\s*def\s+\w+\(")
+
 # Fields to ensure on Retailer (safe, optional defaults)
 WANTED = [
     ("website_id", "website_id: str | None = None"),
@@ -32,19 +37,15 @@ def main():
     txt = PHASE1.read_text(encoding="utf-8", errors="ignore")
 
     # Find the @dataclass Retailer block
-    m = re.search(r"@dataclass\s*[\r\n]+class\s+Retailer\s*:\s*(?P<body>[\s\S]+?)(?=^[^\s#]|\Z)", txt, flags=re.MULTILINE)
+    m = _RE_RETAILER.search(txt)
     if not m:
         print("[ERR] Could not find @dataclass class Retailer")
         sys.exit(2)
 
     body = m.group("body")
 
-    # Collect existing field names
-    existing = set()
-    for line in body.splitlines():
-        ml = re.match(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*:", line)
-        if ml:
-            existing.add(ml.group(1))
+    # Collect existing field names (one pass over the body, anchored per line)
+    existing = {fm.group(1) for fm in _RE_FIELD.finditer(body)}
 
     to_add_lines = []
     for name, decl in WANTED:
@@ -62,24 +63,24 @@ def main():
 
     # Insert the new fields before first def inside the class (or at end of body)
     insert_pos = m.end("body")
-    mm = re.search(r"\n\s*def\s+\w+\(", body)
+    mm = _RE_DEF.search(body)
     if mm:
         insert_pos = m.start("body") + mm.start()
 
     new_body = body[: insert_pos - m.start("body")] + "\n" + "\n".join(to_add_lines) + "\n" + body[insert_pos - m.start("body"):]
     new_txt = txt[: m.start("body")] + new_body + txt[m.end("body"):]
 
-    bkdir = ROOT / f"backups/expand_retailer_{dt.datetime.now().strftime('%Y%m%d-%H%M%S')}"
-    backup(PHASE1, bkdir)
-    PHASE1.write_text(new_txt, encoding="utf-8")
-
+    # Syntax check before touching disk, so a bad patch never clobbers the file
     try:
         compile(new_txt, str(PHASE1), "exec")
     except SyntaxError as e:
-        print(f"[ERR] SyntaxError after patch: {e}")
-        print(f"[HINT] Backup at: {bkdir}")
+        print(f"[ERR] SyntaxError after patch (not written): {e}")
         sys.exit(4)
 
+    bkdir = ROOT / f"backups/expand_retailer_{dt.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    backup(PHASE1, bkdir)
+    PHASE1.write_text(new_txt, encoding="utf-8")
+
     print(f"[OK] Added {len(to_add_lines)} field(s) to Retailer. Backup → {bkdir}")
     print("[OK] phase1_oilbot.py syntax valid.")
 
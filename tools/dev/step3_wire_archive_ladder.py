@@ -5,6 +5,12 @@ from pathlib import Path
 ROOT = Path(".").resolve()
 PHASE1 = ROOT / "tools/phase1/phase1_oilbot.py"
 
+# Precompiled patterns
+_RE_ROWS_LIVE = re.compile(r"^\s*rows_live\s*=\s*.*$", re.MULTILINE)
+_RE_INDENT = re.compile(r"^(\s*)")
+_RE_ORDER_FN_DEF = re.compile(r"def\s+_archive_provider_order\s*\(")
+_RE_TRY_ARCHIVE_DEF = re.compile(r"def\s+_try_archive_listing\s*\(")
+
 def backup(fp: Path, bkdir: Path):
     bkdir.mkdir(parents=True, exist_ok=True)
     shutil.copy2(fp, bkdir / (fp.name + ".bak"))
@@ -126,9 +132,9 @@ def ensure_after_imports(txt: str, block: str) -> tuple[str, bool]:
     else:
         return block.strip() + "\n\n" + txt, True
 
-def inject_helper(txt: str, sentinel_pat: str, helper_block: str) -> tuple[str, bool]:
+def inject_helper(txt: str, sentinel: re.Pattern, helper_block: str) -> tuple[str, bool]:
     """Append helper if sentinel (function name) is missing."""
-    if re.search(sentinel_pat, txt):
+    if sentinel.search(txt):
         return txt, False
     new = txt + ("\n\n" if not txt.endswith("\n") else "\n") + helper_block.strip() + "\n"
     return new, True
@@ -155,11 +161,11 @@ def patch_callsite(txt: str) -> tuple[str, bool]:
     txt, _ = remove_previous_callsite(txt)
 
     # Find 'rows_live ='
-    m = re.search(r"^\s*rows_live\s*=\s*.*$", txt, flags=re.MULTILINE)
+    m = _RE_ROWS_LIVE.search(txt)
     if not m:
         return txt, False
 
-    indent = re.match(r"^(\s*)", m.group(0)).group(1)
+    indent = _RE_INDENT.match(m.group(0)).group(1)
     block = CALLSITE_PATCH_CONTENT.format(mb=CALLSITE_MARKER_BEGIN, me=CALLSITE_MARKER_END)
     # Indent each line of the content to match surrounding block
     indented = "\n".join((indent + line if line.strip() else line) for line in block.splitlines(True))
@@ -183,9 +189,9 @@ def main():
     changed = changed or ch
 
     # 2) helper functions
-    txt, ch = inject_helper(txt, r"def\s+_archive_provider_order\s*\(", BLOCK_ARCHIVE_ORDER_FN)
+    txt, ch = inject_helper(txt, _RE_ORDER_FN_DEF, BLOCK_ARCHIVE_ORDER_FN)
     changed = changed or ch
-    txt, ch = inject_helper(txt, r"def\s+_try_archive_listing\s*\(", BLOCK_TRY_ARCHIVE_FN)
+    txt, ch = inject_helper(txt, _RE_TRY_ARCHIVE_DEF, BLOCK_TRY_ARCHIVE_FN)
     changed = changed or ch
 
     # 3) callsite splice after rows_live (wrapped + marked)
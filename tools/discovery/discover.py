@@ -4,28 +4,98 @@ from __future__ import annotations
 import sys, pathlib
 ROOT = pathlib.Path(__file__).resolve().parents[2]  # repo root
 sys.path.insert(0, str(ROOT / "src"))
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))  # tools.* too
 # ---------------------------------------------------------------------
 
-import argparse, csv, time, random, signal
+import argparse, csv, html, os, re, time, random, signal, threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from urllib import robotparser
 import tldextract
 
 from eopt.ids import make_website_id
+from tools.common import json_dumps_pretty, json_loads
+
+# make_website_id is pure: memoized here, at the discovery call site, per (iso2, root)
+_website_id = lru_cache(maxsize=65536)(make_website_id)
 
 UA = "Mozilla/5.0 (compatible; EOPT-Discovery/1.4)"
 random.seed(42)  # determinism
 
-# Global interrupt flag (so we can flush partial results)
-INTERRUPTED = False
+# Outbound request budget shared by all per-country worker threads, so running
+# countries side by side does not multiply the DuckDuckGo/homepage request rate.
+DISCOVERY_RPS = 2.0
+DISCOVERY_BURST = 4
+
+class _TokenBucket:
+    """Blocking token bucket: take() waits until a request may start."""
+    def __init__(self, rps: float, burst: int):
+        self.rps = rps
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+    def take(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rps)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rps
+            time.sleep(wait)
+
+RATE = _TokenBucket(DISCOVERY_RPS, DISCOVERY_BURST)
+
+class _ThrottledSession(requests.Session):
+    def request(self, *args, **kwargs):
+        RATE.take()
+        return super().request(*args, **kwargs)
+
+# One pooled keep-alive session for every fetch (DDG, robots.txt, homepages): robots+title
+# on the same host reuse the TLS connection. Sessions are safe to share across the
+# per-country worker threads for plain GET/POST; every request draws from RATE.
+SESSION = _ThrottledSession()
+SESSION.headers["User-Agent"] = UA
+_ADAPTER = HTTPAdapter(
+    pool_connections=64, pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+# On-disk robots/title cache so weekly re-runs don't re-download every homepage.
+# Entries younger than CACHE_TTL_S are used as-is; older ones are revalidated with
+# If-None-Match / If-Modified-Since and refreshed on 304.
+CACHE_DIR = ROOT / ".cache" / "discovery"
+CACHE_TTL_S = 7 * 24 * 3600
+_CACHE_LOCK = threading.Lock()
+_CACHE_NAME_RX = re.compile(r"[^a-z0-9.-]")
+
+# <title> lives in <head>; scanning the first 128 KiB with a regex is enough for nearly
+# every homepage, and BeautifulSoup only runs on that prefix when the regex misses.
+# The body is streamed and reading stops as soon as </title> has arrived.
+TITLE_SCAN_BYTES = 128 * 1024
+TITLE_CHUNK_BYTES = 16 * 1024
+_TITLE_RX = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+# Global interrupt flag (so we can flush partial results); an Event so every
+# per-country worker thread sees it.
+INTERRUPTED = threading.Event()
 def _sigint(*_):
-    global INTERRUPTED
-    INTERRUPTED = True
+    INTERRUPTED.set()
 signal.signal(signal.SIGINT, _sigint)
 
 # Marketplace hints for lightweight classification
@@ -34,70 +104,158 @@ MARKETPLACES = {
     "zalando.", "vinted.", "rakuten."
 }
 
+# Cue vocabularies for classify()/score(), built once at import instead of per candidate.
+_HINT_CLASSES = ("grocery", "beauty", "pharmacy", "marketplace")
+_PHARMACY_RX = re.compile("apotheek|pharma|pharmacie|drogerie|drugstore")
+_BEAUTY_RX = re.compile("parfum|cosmétique|cosmetica|make-up|beauty")
+_OIL_CUES = ("olive", "olijfolie", "huile d'olive", "extra vierge", "extra virgin")
+_SUPER_CUES = ("supermarkt", "supermarché", "boodschappen", "winkel", "shop", "drive", "courses")
+_KNOWN_RETAILER_SUBSTR = (
+    "ah", "jumbo", "carrefour", "delhaize", "colruyt", "rewe", "coop", "spar", "lidl", "aldi",
+    "intermarche", "match", "okay", "bioplanet", "dirk", "plus", "poiesz", "dekamarkt", "hoogvliet",
+    "picnic", "cora", "ekoplaza",
+)
+
+# Bundled PSL snapshot, no disk cache: no network fetch or cache-file locking when several
+# country workers resolve domains at once.
+_TLD_EXTRACT = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+@lru_cache(maxsize=65536)
 def root_domain(url_or_host: str) -> str:
     host = urlparse(url_or_host).netloc or url_or_host
-    ext = tldextract.extract(host)
+    ext = _TLD_EXTRACT(host)
     if not ext.domain or not ext.suffix:
         return host.lower()
     return f"{ext.domain}.{ext.suffix}".lower()
 
-def ddg_search(query: str, max_results: int = 80) -> List[str]:
-    """DuckDuckGo HTML endpoint with strict timeout."""
+def ddg_search(query: str, max_results: int = 80) -> Dict[str, str]:
+    """
+    DuckDuckGo HTML endpoint with strict timeout.
+    Returns {root_domain: first_url} in result order, so repeat hits on the same site
+    are collapsed before they reach add_candidate.
+    """
     try:
         url = "https://html.duckduckgo.com/html/"
-        resp = requests.post(
+        resp = SESSION.post(
             url,
             data={"q": query},
-            headers={"User-Agent": UA},
             timeout=8,   # snappy; keeps --max-seconds effective
         )
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "lxml")
-        hrefs: List[str] = []
+        roots: Dict[str, str] = {}
+        n_hits = 0
         for a in soup.select("a.result__a"):
             href = a.get("href") or ""
             if href.startswith("http"):
-                hrefs.append(href)
-                if len(hrefs) >= max_results:
+                roots.setdefault(root_domain(href), href)
+                n_hits += 1
+                if n_hits >= max_results:
                     break
-        return hrefs
+        return roots
+    except Exception:
+        return {}
+
+def _cache_path(rd: str) -> Path:
+    return CACHE_DIR / f"{_CACHE_NAME_RX.sub('_', rd.lower())}.json"
+
+def _cache_load(rd: str) -> Dict[str, Any]:
+    try:
+        return json_loads(_cache_path(rd).read_bytes())
     except Exception:
-        return []
+        return {}
+
+def _cache_store(rd: str, kind: str, entry: Dict[str, Any]) -> None:
+    fp = _cache_path(rd)
+    with _CACHE_LOCK:
+        doc = _cache_load(rd)
+        doc[kind] = entry
+        try:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            tmp = fp.with_suffix(".tmp")
+            tmp.write_bytes(json_dumps_pretty(doc))
+            os.replace(tmp, fp)
+        except OSError:
+            pass  # cache is best-effort
+
+def _cacheable(status: int) -> bool:
+    # Success, or a definitive "not there". Other 4xx (401/403/429, bot walls)
+    # are often temporary and must not be replayed for CACHE_TTL_S.
+    return 200 <= status < 300 or status in (404, 410)
+
+def _cached_fetch(rd: str, kind: str, url: str, timeout: float,
+                  parse: Callable[[requests.Response], Any], stream: bool = False) -> Any:
+    """
+    GET `url` and return `parse(response)`, backed by the per-domain disk cache.
+    Only 2xx and 404/410 responses are cached; network errors propagate to the caller.
+    """
+    entry = _cache_load(rd).get(kind)
+    now = time.time()
+    if entry and now - entry.get("ts", 0) < CACHE_TTL_S:
+        return entry["value"]
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    with SESSION.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=stream) as r:
+        if r.status_code == 304 and entry:
+            entry["ts"] = now
+            _cache_store(rd, kind, entry)
+            return entry["value"]
+        value = parse(r)
+    if _cacheable(r.status_code):
+        _cache_store(rd, kind, {
+            "value": value,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "ts": now,
+        })
+    return value
+
+def _parse_robots(r: requests.Response) -> str:
+    if r.status_code >= 500 or not r.text:
+        return "review"
+    rp = robotparser.RobotFileParser()
+    rp.parse(r.text.splitlines())
+    return "allowed" if rp.can_fetch(UA, "/") else "blocked"
 
+@lru_cache(maxsize=4096)
 def check_robots(site_root: str, timeout: float = 4.0) -> str:
     """Fetch robots.txt with a strict timeout and parse locally."""
     try:
-        r = requests.get(
-            f"https://{site_root}/robots.txt",
-            headers={"User-Agent": UA},
-            timeout=timeout,
-            allow_redirects=True,
-        )
-        if r.status_code >= 500 or not r.text:
-            return "review"
-        rp = robotparser.RobotFileParser()
-        rp.parse(r.text.splitlines())
-        return "allowed" if rp.can_fetch(UA, "/") else "blocked"
+        return _cached_fetch(site_root, "robots", f"https://{site_root}/robots.txt", timeout, _parse_robots)
     except requests.Timeout:
         return "review"
     except Exception:
         return "review"
 
-def classify(host: str, title_text: str, hints: Dict[str, List[str]]) -> str:
+def compile_class_hints(hints: Dict[str, List[str]]) -> Dict[str, re.Pattern]:
+    """One alternation regex per hint class, kept in _HINT_CLASSES priority order."""
+    out: Dict[str, re.Pattern] = {}
+    for k in _HINT_CLASSES:
+        words = hints.get(k) or []
+        if words:
+            out[k] = re.compile("|".join(re.escape(w.lower()) for w in words))
+    return out
+
+def classify(host: str, title_text: str, hints: Dict[str, re.Pattern]) -> str:
+    """`hints` comes from compile_class_hints(); the first class with a hit wins."""
     low = f"{host} {title_text}".lower()
     if any(mp in host for mp in MARKETPLACES):
         return "marketplace"
-    for k in ("grocery","beauty","pharmacy","marketplace"):
-        for w in hints.get(k, []):
-            if w.lower() in low:
-                return k
-    if any(x in low for x in ["apotheek","pharma","pharmacie","drogerie","drugstore"]):
+    for k, rx in hints.items():
+        if rx.search(low):
+            return k
+    if _PHARMACY_RX.search(low):
         return "pharmacy"
-    if any(x in low for x in ["parfum","cosmétique","cosmetica","make-up","beauty"]):
+    if _BEAUTY_RX.search(low):
         return "beauty"
     return "grocery"
 
-def score(rd: str, title_text: str, q: str, iso2: str, cfg: Dict) -> float:
+def score(rd: str, title_text: str, q_tokens: frozenset, iso2: str, boost_set: frozenset) -> float:
     """
     Base heuristic + boosts:
       - domain in boost_domains -> +0.35
@@ -111,9 +269,8 @@ def score(rd: str, title_text: str, q: str, iso2: str, cfg: Dict) -> float:
     low = f"{host} {title_text}".lower()
     s = 0.0
 
-    # 1) explicit domain boosts from config
-    boost_domains = {d.strip().lower() for d in cfg.get("boost_domains", [])}
-    if host in boost_domains:
+    # 1) explicit domain boosts from config (normalized once per country)
+    if host in boost_set:
         s += 0.35
 
     # 2) country TLD match (e.g., *.nl for NL)
@@ -122,37 +279,57 @@ def score(rd: str, title_text: str, q: str, iso2: str, cfg: Dict) -> float:
         s += 0.15
 
     # 3) query-term presence
-    for term in set(q.lower().split()):
-        if term and term in low:
+    for term in q_tokens:
+        if term in low:
             s += 0.05
 
     # 4) oil cues
-    if any(w in low for w in ["olive", "olijfolie", "huile d'olive", "extra vierge", "extra virgin"]):
+    if any(w in low for w in _OIL_CUES):
         s += 0.35
 
     # 5) supermarket cues
-    if any(w in low for w in ["supermarkt","supermarché","boodschappen","winkel","shop","drive","courses"]):
+    if any(w in low for w in _SUPER_CUES):
         s += 0.20
 
     # 6) known retailer substrings
-    if any(x in host for x in [
-        "ah","jumbo","carrefour","delhaize","colruyt","rewe","coop","spar","lidl","aldi",
-        "intermarche","match","okay","bioplanet","dirk","plus","poiesz","dekamarkt","hoogvliet","picnic","cora","ekoplaza"
-    ]):
+    if any(x in host for x in _KNOWN_RETAILER_SUBSTR):
         s += 0.20
 
     return min(1.0, round(s, 3))
 
+def _read_head(r: requests.Response) -> bytes:
+    buf = bytearray()
+    for chunk in r.iter_content(chunk_size=TITLE_CHUNK_BYTES):
+        tail_from = max(0, len(buf) - 8)  # '</title' may straddle chunks
+        buf += chunk
+        if len(buf) >= TITLE_SCAN_BYTES or b"</title" in buf[tail_from:].lower():
+            break
+    return bytes(buf[:TITLE_SCAN_BYTES])
+
+def _decode_head(r: requests.Response, head: bytes) -> str:
+    """head decoded the way r.text decodes a full body: the declared charset,
+    else a guess from the bytes (apparent_encoding needs the whole body)."""
+    encoding = r.encoding
+    if encoding is None:
+        encoding = requests.compat.chardet.detect(head)["encoding"] if requests.compat.chardet else "utf-8"
+    try:
+        return str(head, encoding or "utf-8", errors="replace")
+    except (LookupError, TypeError):
+        return str(head, errors="replace")
+
+def _parse_title(r: requests.Response) -> str:
+    if not r.ok:
+        return ""
+    head = _decode_head(r, _read_head(r))
+    m = _TITLE_RX.search(head)
+    if m:
+        return html.unescape(m.group(1)).strip()
+    return (BeautifulSoup(head, "lxml").title or "").get_text(strip=True)
+
+@lru_cache(maxsize=4096)
 def fetch_title(rd: str, timeout: float = 12.0) -> str:
     try:
-        r = requests.get(
-            f"https://{rd}",
-            headers={"User-Agent": UA},
-            timeout=timeout,
-            allow_redirects=True
-        )
-        r.raise_for_status()
-        return (BeautifulSoup(r.text, "lxml").title or "").get_text(strip=True) or rd
+        return _cached_fetch(rd, "title", f"https://{rd}", timeout, _parse_title, stream=True) or rd
     except Exception:
         return rd
 
@@ -161,19 +338,19 @@ def add_candidate(
     seen_domains: set,
     iso2: str,
     rd: str,
-    q: str,
-    klass_hints: Dict[str, List[str]],
-    cfg: Dict,
+    q_tokens: frozenset,
+    klass_hints: Dict[str, re.Pattern],
+    boost_set: frozenset,
     fast: bool = False
 ) -> None:
     if not rd or rd in seen_domains:
         return
     seen_domains.add(rd)
-    robots = check_robots(rd)  # bounded timeout
+    robots = "review" if fast else check_robots(rd)  # bounded timeout; --fast stays offline
     title = rd if (fast or robots == "blocked") else fetch_title(rd)
     klass = classify(rd, title, klass_hints)
-    sc = score(rd, title, q, iso2, cfg)
-    wid = make_website_id(iso2, rd)
+    sc = score(rd, title, q_tokens, iso2, boost_set)
+    wid = _website_id(iso2, rd)
     candidates.append({
         "country": iso2,
         "site_domain": rd,
@@ -191,11 +368,10 @@ def write_candidates_csv(candidates: List[Dict], out_csv: Path) -> None:
         "country","site_domain","website_id","chain_guess",
         "retailer_class_guess","relevance_score","robots_status","notes"
     ]
-    with out_csv.open("w", newline="", encoding="utf-8") as fh:
-        wr = csv.DictWriter(fh, fieldnames=header)
+    with out_csv.open("w", newline="", encoding="utf-8", buffering=1 << 20) as fh:
+        wr = csv.DictWriter(fh, fieldnames=header, extrasaction="ignore")
         wr.writeheader()
-        for r in candidates:
-            wr.writerow(r)
+        wr.writerows(candidates)
 
 def discover_country(
     iso2: str,
@@ -210,17 +386,19 @@ def discover_country(
     start = time.time()
     iso2 = iso2.upper()
     queries: List[str] = cfg.get("query_terms", [])
-    class_hints: Dict[str, List[str]] = cfg.get("class_hints", {})
+    # compile config vocabularies once per country, not once per candidate
+    class_hints = compile_class_hints(cfg.get("class_hints") or {})
     site_filters: List[str] = cfg.get("site_filters", [f".{iso2.lower()}"])
     max_results: int = int(cfg.get("max_results", 80))
     boost_domains: List[str] = cfg.get("boost_domains", [])
+    boost_set = frozenset(d.strip().lower() for d in boost_domains)
     throttle_ms: int = int(cfg.get("throttle_ms", 600))  # deterministic pause
 
     seen_domains: set[str] = set()
     candidates: List[Dict] = []
 
     def maybe_stop() -> bool:
-        if INTERRUPTED:
+        if INTERRUPTED.is_set():
             return True
         if max_candidates and len(candidates) >= max_candidates:
             return True
@@ -229,9 +407,10 @@ def discover_country(
         return False
 
     # 1) Boosts first
+    boost_tokens = frozenset(("boost",))
     for dom in boost_domains:
         rd = root_domain(dom)
-        add_candidate(candidates, seen_domains, iso2, rd, q="boost", klass_hints=class_hints, cfg=cfg, fast=fast)
+        add_candidate(candidates, seen_domains, iso2, rd, q_tokens=boost_tokens, klass_hints=class_hints, boost_set=boost_set, fast=fast)
         if maybe_stop():
             break
 
@@ -240,24 +419,25 @@ def discover_country(
     for q in queries:
         if outer_break or maybe_stop():
             break
+        q_tokens = frozenset(q.lower().split())  # once per query, not per candidate
         for s in site_filters:
             if maybe_stop():
                 outer_break = True
                 break
             qtext = f"{q} site:{s}" if s else q
-            hrefs = ddg_search(qtext, max_results=max_results)
+            roots = ddg_search(qtext, max_results=max_results)
             time.sleep(throttle_ms / 1000.0)
-            for url in hrefs:
-                rd = root_domain(url)
-                add_candidate(candidates, seen_domains, iso2, rd, q=q, klass_hints=class_hints, cfg=cfg, fast=fast)
+            for rd in roots:
+                add_candidate(candidates, seen_domains, iso2, rd, q_tokens=q_tokens, klass_hints=class_hints, boost_set=boost_set, fast=fast)
                 if maybe_stop():
                     outer_break = True
                     break
             if outer_break:
                 break
 
-    # stable order
-    candidates.sort(key=lambda r: (r["site_domain"], -r["relevance_score"]))
+    # stable order; site_domain is unique per country (seen_domains), so the old
+    # -relevance_score tiebreak never applied and a C-level itemgetter key is enough
+    candidates.sort(key=itemgetter("site_domain"))
 
     # write CSV regardless
     csv_path = out_dir / f"candidates_{week_tag}_{iso2}.csv"
@@ -269,6 +449,7 @@ def discover_country(
 
 def write_diffs(proposed: Dict[str, List[Tuple[str,str]]], out_dir: Path) -> None:
     import yaml
+    Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)  # libyaml when available
     reg = []
     for iso2, lst in proposed.items():
         for wid, chain in lst:
@@ -282,16 +463,14 @@ def write_diffs(proposed: Dict[str, List[Tuple[str,str]]], out_dir: Path) -> Non
                 "robots_status": "review",
                 "notes": "proposed_by_discovery",
             })
-    (out_dir / "proposed_registry_diff.yaml").write_text(
-        yaml.safe_dump(reg, sort_keys=False, allow_unicode=True), encoding="utf-8"
-    )
+    with (out_dir / "proposed_registry_diff.yaml").open("w", encoding="utf-8") as fh:
+        yaml.dump(reg, fh, Dumper=Dumper, sort_keys=False, allow_unicode=True)
     diff_dir = out_dir / "proposed_manifests_diff"
     diff_dir.mkdir(parents=True, exist_ok=True)
     for iso2, lst in proposed.items():
         doc = {"country": iso2, "long_tail_add": [{"website_id": w} for w, _ in lst]}
-        (diff_dir / f"{iso2}.yaml").write_text(
-            yaml.safe_dump(doc, sort_keys=False, allow_unicode=True), encoding="utf-8"
-        )
+        with (diff_dir / f"{iso2}.yaml").open("w", encoding="utf-8") as fh:
+            yaml.dump(doc, fh, Dumper=Dumper, sort_keys=False, allow_unicode=True)
 
 def _default_week_tag() -> str:
     import datetime as dt
@@ -305,28 +484,41 @@ def main():
     ap.add_argument("--out", required=True)
     ap.add_argument("--week-tag", default=_default_week_tag())
     ap.add_argument("--fast", action="store_true",
-                    help="Skip fetching titles; score by domain+query only")
+                    help="Skip robots.txt and title fetches (robots_status=review); "
+                         "score by domain+query only")
     ap.add_argument("--max-candidates", type=int, default=None,
                     help="Stop after N candidates per country")
     ap.add_argument("--max-seconds", type=int, default=None,
                     help="Hard time limit per country (seconds)")
+    ap.add_argument("--rps", type=float, default=DISCOVERY_RPS,
+                    help="Request rate shared by all countries (requests/second)")
     args = ap.parse_args()
+    RATE.rps = args.rps
 
     import yaml
-    cfg_all = yaml.safe_load(Path(args.config).read_text(encoding="utf-8")) or {}
+    Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml when available
+    with Path(args.config).open("r", encoding="utf-8") as fh:
+        cfg_all = yaml.load(fh, Loader=Loader) or {}
 
-    all_proposed: Dict[str, List[Tuple[str,str]]] = {}
     out_dir = Path(args.out)
+    countries = list(dict.fromkeys(c.upper() for c in args.countries))
 
-    for iso2 in args.countries:
-        cfg = cfg_all.get(iso2.upper(), {})
-        cands, prop = discover_country(
-            iso2.upper(), cfg, out_dir, args.week_tag,
-            fast=args.fast, max_candidates=args.max_candidates, max_seconds=args.max_seconds
-        )
-        all_proposed[iso2.upper()] = prop
-        print(f"[OK] {iso2.upper()}: {len(cands)} candidates "
-              f"(≥0.7: {sum(1 for _,_ in prop)}){' [INTERRUPTED]' if INTERRUPTED else ''}")
+    # Countries are independent and network-bound: run them side by side (all
+    # drawing on the shared RATE budget); results are collected in CLI order.
+    all_proposed: Dict[str, List[Tuple[str,str]]] = {}
+    with ThreadPoolExecutor(max_workers=min(8, len(countries)) or 1) as ex:
+        futs = [
+            ex.submit(
+                discover_country, iso2, cfg_all.get(iso2, {}), out_dir, args.week_tag,
+                fast=args.fast, max_candidates=args.max_candidates, max_seconds=args.max_seconds
+            )
+            for iso2 in countries
+        ]
+        for iso2, fut in zip(countries, futs):
+            cands, prop = fut.result()
+            all_proposed[iso2] = prop
+            print(f"[OK] {iso2}: {len(cands)} candidates "
+                  f"(≥0.7: {sum(1 for _,_ in prop)}){' [INTERRUPTED]' if INTERRUPTED.is_set() else ''}")
 
     write_diffs(all_proposed, out_dir)
     print("[OK] Discovery complete.")
@@ -13,10 +13,20 @@ Stdlib only. Safe to run anywhere.
 """
 
 from __future__ import annotations
-import argparse, csv, json, os, re, sys, time
+import argparse, csv, hashlib, json, mmap, os, re, sqlite3, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+# --- import shim so "tools.*" works when run directly ---
+_root = Path(__file__).resolve().parents[2]  # project root
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+# -------------------------------------------------------
+
+from tools.common import path_exists
+
 # -------------------------- helpers --------------------------
 
 RESET = "\033[0m"
@@ -32,36 +42,244 @@ def color(s, c):
 def read_text(p: Path) -> str:
     try:
         return p.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        try:
-            return p.read_text(encoding="latin-1", errors="ignore")
-        except Exception:
-            return ""
+    except OSError:
+        return ""
+
+# Directory names never descended into (virtual envs/node_modules/builds)
+EXCLUDED = frozenset({".venv", "venv", "node_modules", ".git", ".next", "dist", "build", "__pycache__"})
+# Generated files that are large and never carry the patterns we look for
+SKIP_FILE_RX = re.compile(r"(?:package-lock\.json|yarn\.lock|pnpm-lock\.yaml|.*\.min\.js)\Z", re.IGNORECASE)
 
-def find_files(root: Path, exts: Tuple[str,...]=(".py",".json",".yaml",".yml",".csv",".md",".ps1",".sh",".ts",".tsx",".cjs",".mjs",".js")) -> List[Path]:
+def find_files(root: Path, exts: Tuple[str,...]=(".py",".json",".yaml",".yml",".csv",".md",".ps1",".sh",".ts",".tsx",".cjs",".mjs",".js")) -> List[str]:
+    exts = tuple(e.lower() for e in exts)
     files = []
-    for dp, dn, fn in os.walk(root):
-        # skip virtual envs/node_modules/builds for speed
-        skip = any(x in dp.replace("\\","/") for x in ["/.venv","/venv","/node_modules","/.git","/.next","/dist","/build","/__pycache__"])
-        if skip: 
+    stack = [str(root)]
+    # Depth-first, top-down, same visiting order as os.walk(); excluded
+    # directories are pruned by name before they are ever listed.
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
             continue
-        for f in fn:
-            if f.lower().endswith(exts):
-                files.append(Path(dp)/f)
+        subdirs = []
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                if e.name not in EXCLUDED:
+                    subdirs.append(e.path)
+            elif e.name.lower().endswith(exts) and not SKIP_FILE_RX.match(e.name) and e.is_file():
+                files.append(e.path)
+        stack.extend(reversed(subdirs))
     return files
 
-def grep(files: List[Path], patterns: List[str]) -> Dict[str, List[str]]:
-    rx = [re.compile(p, re.IGNORECASE) for p in patterns]
-    hits = {p: [] for p in patterns}
-    for f in files:
+# Set per worker process by _init_scan_worker (regex objects are not shipped
+# across the pool; only the pattern strings are, compiled once per process by
+# the memoized combine_patterns/single_patterns). Each pattern group
+# is folded into one alternation of named groups so a file is walked once per
+# group; the alternation sits inside a lookahead so a long match (e.g.
+# "headers.*Referer") cannot swallow another pattern's match. At one position
+# only the first matching alternative is reported, so patterns still unseen
+# after the pass are confirmed with their own search (see _match_flags).
+# Matching runs on raw bytes, so no decode is needed and encoding does not matter.
+_SCAN_GROUPS: List[Tuple["re.Pattern[bytes]", Tuple["re.Pattern[bytes]", ...]]] = []
+
+# Below this size a plain read() is cheaper than setting up a mapping.
+MMAP_MIN_BYTES = 16 * 1024
+# Files above this size are skipped unless they are data/docs we care about.
+MAX_SCAN_BYTES = 8 * 1024 * 1024
+LARGE_OK_EXTS = (".csv", ".md")
+# A NUL byte in the first block marks a binary file.
+BINARY_PROBE_BYTES = 4096
+_MADV_SEQUENTIAL = getattr(mmap, "MADV_SEQUENTIAL", None)  # not on Windows
+_O_BINARY = getattr(os, "O_BINARY", 0)  # Windows only: no newline translation
+
+@lru_cache(maxsize=None)
+def combine_patterns(patterns: Tuple[str, ...]) -> "re.Pattern[bytes]":
+    alt = "|".join(f"(?P<g{i}>{p})" for i, p in enumerate(patterns))
+    return re.compile(f"(?=(?:{alt}))".encode("utf-8"), re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def single_patterns(patterns: Tuple[str, ...]) -> Tuple["re.Pattern[bytes]", ...]:
+    return tuple(re.compile(p.encode("utf-8"), re.IGNORECASE) for p in patterns)
+
+def _init_scan_worker(groups: List[List[str]]) -> None:
+    global _SCAN_GROUPS
+    _SCAN_GROUPS = [(combine_patterns(tuple(pats)), single_patterns(tuple(pats))) for pats in groups]
+
+def _match_flags(rx: "re.Pattern[bytes]", singles: Tuple["re.Pattern[bytes]", ...], buf,
+                 need: Optional[frozenset]) -> List[bool]:
+    n = len(singles)
+    found = [False] * n
+    left = n if need is None else len(need)
+    for m in rx.finditer(buf):
+        i = int(m.lastgroup[1:])
+        if not found[i]:
+            found[i] = True
+            if need is None or i in need:
+                left -= 1
+                if not left:
+                    return found
+    # An alternative that only matches where an earlier one also does is never
+    # reported by the combined pass: confirm the still-missing ones directly.
+    for i, one in enumerate(singles):
+        if not found[i] and (need is None or i in need) and one.search(buf):
+            found[i] = True
+    return found
+
+def _scan_one(f: str, need: Optional[List[frozenset]] = None) -> List[List[bool]]:
+    """Per-group, per-pattern presence flags for one file, read once. A group
+    stops as soon as every pattern in its ``need`` set (default: all) has
+    matched; groups with nothing left to find are not run. Oversized and
+    binary files report no hits."""
+    flags = [[False] * len(singles) for _, singles in _SCAN_GROUPS]
+
+    def run(buf) -> None:
+        if b"\0" in buf[:BINARY_PROBE_BYTES]:
+            return
+        for g, (rx, singles) in enumerate(_SCAN_GROUPS):
+            want = None if need is None else need[g]
+            if want is None or want:
+                flags[g] = _match_flags(rx, singles, buf, want)
+
+    # Unreadable directories were already skipped by find_files(); a file
+    # that cannot be opened (permissions, dangling symlink) just has no hits.
+    try:
+        fd = os.open(f, os.O_RDONLY | _O_BINARY)
+    except OSError:
+        return flags
+    try:
+        size = os.fstat(fd).st_size
+        if size > MAX_SCAN_BYTES and not f.lower().endswith(LARGE_OK_EXTS):
+            return flags
+        if size < MMAP_MIN_BYTES:
+            run(os.read(fd, size))
+        else:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                if _MADV_SEQUENTIAL is not None:
+                    mm.madvise(_MADV_SEQUENTIAL)
+                run(mm)
+    finally:
+        os.close(fd)
+    return flags
+
+class ScanCache:
+    """Per-file scan results in SQLite, keyed by (path, mtime_ns, size) plus a
+    hash of the pattern groups, so edited files or patterns are rescanned."""
+
+    VERSION = "2"  # bump when the skip/match rules in _scan_one change
+
+    def __init__(self, db: Path, groups: List[List[str]]):
+        blob = "\x1e".join("\n".join(g) for g in groups)
+        self.tag = hashlib.blake2b(f"{self.VERSION}\x1f{blob}".encode("utf-8"), digest_size=8).hexdigest()
+        self.sizes = [len(g) for g in groups]
+        self.conn = sqlite3.connect(str(db))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scan_cache ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, tag TEXT, hits TEXT)"
+        )
+        self.rows = {r[0]: r[1:] for r in self.conn.execute("SELECT path, mtime_ns, size, tag, hits FROM scan_cache")}
+        self.keys: Dict[str, Tuple[int, int]] = {}
+        self.fresh: List[Tuple[str, int, int, str, str]] = []
+
+    def get(self, f: str) -> Optional[List[List[bool]]]:
         try:
-            txt = read_text(f)
-        except Exception:
+            st = os.stat(f)
+        except OSError:
+            return None
+        key = self.keys[f] = (st.st_mtime_ns, st.st_size)
+        row = self.rows.get(f)
+        if row is None or (row[0], row[1]) != key or row[2] != self.tag:
+            return None
+        flags = [[False] * n for n in self.sizes]
+        for g, idx in enumerate(json.loads(row[3])):
+            for i in idx:
+                flags[g][i] = True
+        return flags
+
+    def put(self, f: str, flags: List[List[bool]]) -> None:
+        key = self.keys.get(f)
+        if key is None:
+            return
+        hits = json.dumps([[i for i, hit in enumerate(row) if hit] for row in flags])
+        self.fresh.append((f, key[0], key[1], self.tag, hits))
+
+    def close(self) -> None:
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO scan_cache VALUES (?,?,?,?,?)", self.fresh)
+        self.conn.close()
+
+def scan_all(files: List[str], pattern_groups: Dict[str, List[str]], jobs: int = 1,
+             first_hit: bool = False, cache_db: Optional[Path] = None) -> Dict[str, Dict[str, List[str]]]:
+    """Map each group's patterns to the files they match, reading every file
+    once for all groups.
+
+    With ``first_hit`` the scan stops once every pattern has matched
+    somewhere, so each list only holds the files seen up to that point
+    (enough for the presence checks, not a full index). With ``cache_db``
+    unchanged files reuse their results from the previous run.
+    """
+    names = list(pattern_groups)
+    groups = [pattern_groups[k] for k in names]
+    hits = [{p: [] for p in pats} for pats in groups]
+    remaining = [set(range(len(pats))) for pats in groups]
+    results: Dict[str, List[List[bool]]] = {}
+
+    def note(f: str, flags: List[List[bool]]) -> None:
+        results[f] = flags
+        for g, row in enumerate(flags):
+            for i, hit in enumerate(row):
+                if hit:
+                    remaining[g].discard(i)
+
+    cache = ScanCache(cache_db, groups) if cache_db is not None else None
+    todo = files
+    if cache is not None:
+        todo = []
+        for f in files:
+            flags = cache.get(f)
+            if flags is None:
+                todo.append(f)
+            else:
+                note(f, flags)
+
+    try:
+        if first_hit and not any(remaining):
+            pass
+        elif jobs > 1 and len(todo) > jobs:
+            chunk = max(1, len(todo) // (4 * jobs))
+            ex = ProcessPoolExecutor(max_workers=jobs, initializer=_init_scan_worker, initargs=(groups,))
+            try:
+                for f, flags in zip(todo, ex.map(_scan_one, todo, chunksize=chunk)):
+                    note(f, flags)
+                    if cache is not None:
+                        cache.put(f, flags)
+                    if first_hit and not any(remaining):
+                        break
+            finally:
+                ex.shutdown(wait=True, cancel_futures=True)
+        else:
+            _init_scan_worker(groups)
+            for f in todo:
+                if first_hit and not any(remaining):
+                    break
+                # partial (need-limited) results are never cached
+                flags = _scan_one(f, [frozenset(r) for r in remaining] if first_hit else None)
+                note(f, flags)
+                if cache is not None and not first_hit:
+                    cache.put(f, flags)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    for f in files:
+        flags = results.get(f)
+        if flags is None:
             continue
-        for i, r in enumerate(rx):
-            if r.search(txt):
-                hits[patterns[i]].append(str(f))
-    return hits
+        for g, row in enumerate(flags):
+            for i, hit in enumerate(row):
+                if hit:
+                    hits[g][groups[g][i]].append(f)
+    return dict(zip(names, hits))
 
 def load_json(p: Path) -> Optional[dict]:
     if not p.exists(): return None
@@ -70,23 +288,19 @@ def load_json(p: Path) -> Optional[dict]:
     except Exception:
         return None
 
-def load_csv(p: Path) -> Tuple[List[str], List[Dict[str,str]]]:
+def load_csv(p: Path, columns: Tuple[str,...]) -> Tuple[List[str], List[Dict[str,str]]]:
+    """Headers plus, per row, only the requested (lower-case) columns."""
     if not p.exists(): return ([], [])
     rows = []
     with p.open("r", encoding="utf-8", errors="ignore", newline="") as fh:
-        sniffer = csv.Sniffer()
-        data = fh.read()
-        fh.seek(0)
-        dialect = None
-        try:
-            dialect = sniffer.sniff(data.splitlines()[0] if data else ",")
-        except Exception:
-            pass
-        fh.seek(0)
-        reader = csv.DictReader(fh, dialect=dialect) if dialect else csv.DictReader(fh)
-        headers = [h.strip() for h in (reader.fieldnames or [])]
+        reader = csv.reader(fh)
+        headers = [h.strip() for h in next(reader, [])]
+        idx = {h.lower(): i for i, h in enumerate(headers)}
+        want = [(c, idx[c]) for c in columns if c in idx]
         for r in reader:
-            rows.append({k.strip(): (v or "").strip() for k,v in r.items()})
+            if not r:
+                continue
+            rows.append({c: (r[i].strip() if i < len(r) else "") for c, i in want})
         return (headers, rows)
 
 def ensure_dir(p: Path) -> None:
@@ -173,8 +387,7 @@ CANDIDATE_FILES = {
 
 # ------------------------ checks -----------------------------
 
-def check_backup_impl(all_files: List[Path]) -> Dict:
-    hits = grep(all_files, BACKUP_CODE_PATTERNS)
+def check_backup_impl(hits: Dict[str, List[str]]) -> Dict:
     totals = {k: (len(v) > 0) for k,v in hits.items()}
 
     score_items = sum(1 for v in totals.values() if v)
@@ -203,27 +416,28 @@ def check_backup_impl(all_files: List[Path]) -> Dict:
 
 def resolve_first_existing(root: Path, candidates: List[str]) -> Optional[Path]:
     for c in candidates:
-        p = (root / c).resolve()
-        if p.exists():
-            return p
+        p = root / c
+        if path_exists(p):
+            return p.resolve()
     return None
 
 def check_retailers_csv(root: Path) -> Dict:
     path = resolve_first_existing(root, CANDIDATE_FILES["retailers_csv"])
-    headers, rows = load_csv(path) if path else ([], [])
+    headers, rows = load_csv(path, ("retailer", "code")) if path else ([], [])
     issues = []
     if not path:
         issues.append("retailers.csv not found (checked common locations)")
     else:
         # headers present?
+        headers_lc = {x.lower() for x in headers}
         for h in EXPECTED_RETAILER_COLUMNS:
-            if h not in [x.lower() for x in headers]:
+            if h not in headers_lc:
                 issues.append(f"Missing column in {path.name}: {h}")
 
         # each retailer row exists?
+        present = {r.get(k, "").lower() for r in rows for k in ("retailer", "code")}
         for code in RETAILERS:
-            found = any((r.get("retailer","").lower()==code) or (r.get("code","").lower()==code) for r in rows)
-            if not found:
+            if code not in present:
                 issues.append(f"Missing row for retailer: {code}")
 
     return {
@@ -262,8 +476,7 @@ def check_selectors_json(root: Path) -> Dict:
         "ok": len(issues)==0
     }
 
-def check_unblocking_impl(all_files: List[Path]) -> Dict:
-    hits = grep(all_files, UNBLOCK_PATTERNS)
+def check_unblocking_impl(hits: Dict[str, List[str]]) -> Dict:
     totals = {k: (len(v) > 0) for k,v in hits.items()}
     score_items = sum(1 for v in totals.values() if v)
     score_total = len(totals)
@@ -292,9 +505,9 @@ def check_unblocking_impl(all_files: List[Path]) -> Dict:
 def scan_phase1_runners(root: Path) -> Dict:
     found = []
     for rel in CANDIDATE_FILES["phase1_runners"]:
-        p = (root / rel).resolve()
-        if p.exists():
-            found.append(str(p))
+        p = root / rel
+        if path_exists(p):
+            found.append(str(p.resolve()))
     return {"type":"phase1_runner_files","paths":found}
 
 # ------------------------ reporting --------------------------
@@ -398,22 +611,33 @@ def console_summary(report: Dict) -> int:
 def main():
     ap = argparse.ArgumentParser(description="Scan repo for backup/archiving + retailer-unblock readiness.")
     ap.add_argument("--root", default=".", help="Project root (default: .)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Worker processes for pattern scanning (default: CPU count; 1 = serial)")
+    ap.add_argument("--quick", action="store_true",
+                    help="Stop scanning once every pattern has one hit (report.json file lists become partial)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="Rescan every file instead of reusing debug/scan_report/.scan_cache.sqlite")
     args = ap.parse_args()
 
     root = Path(args.root).resolve()
+    out_dir = root / "debug" / "scan_report"
+    ensure_dir(out_dir)
+
     files = find_files(root)
+    hits = scan_all(files, {"backup": BACKUP_CODE_PATTERNS, "unblocking": UNBLOCK_PATTERNS},
+                    args.jobs, args.quick, None if args.no_cache else out_dir / ".scan_cache.sqlite")
 
     report = {}
-    report["backup"] = check_backup_impl(files)
-    report["unblocking"] = check_unblocking_impl(files)
+    report["backup"] = check_backup_impl(hits["backup"])
+    report["unblocking"] = check_unblocking_impl(hits["unblocking"])
     report["retailers_csv"] = check_retailers_csv(root)
     report["selectors_json"] = check_selectors_json(root)
     report["phase1_runners"] = scan_phase1_runners(root)
 
-    out_dir = root / "debug" / "scan_report"
-    ensure_dir(out_dir)
-    (out_dir / "report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
-    (out_dir / "report.md").write_text(to_markdown(report), encoding="utf-8")
+    with (out_dir / "report.json").open("w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    with (out_dir / "report.md").open("w", encoding="utf-8") as fh:
+        fh.write(to_markdown(report))
 
     rc = console_summary(report)
     sys.exit(rc)
@@ -6,7 +6,9 @@ import csv
 import datetime as dt
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -17,6 +19,9 @@ def nowstamp() -> str:
     return dt.datetime.now().strftime("%Y%m%d-%H%M%S")
 
 
+# Several checks look at the same files (phase1_oilbot.py is read by four of
+# them); both helpers are memoized and reset at the start of run_checks().
+@lru_cache(maxsize=512)
 def read_text_safe(p: Path) -> str:
     try:
         return p.read_text(encoding="utf-8", errors="ignore")
@@ -24,6 +29,7 @@ def read_text_safe(p: Path) -> str:
         return ""
 
 
+@lru_cache(maxsize=512)
 def exists(p: Path) -> bool:
     try:
         return p.exists()
@@ -31,8 +37,71 @@ def exists(p: Path) -> bool:
         return False
 
 
-def has(text: str, pattern: str, flags=re.DOTALL) -> bool:
-    return re.search(pattern, text, flags=flags) is not None
+# ---------- per-file pattern checks
+# Every regex a check needs from a file, keyed by the issue code it guards.
+# Each file is walked once with a combined lookahead alternation; codes that
+# did not fire there are confirmed with their own search, so overlapping
+# patterns can never hide one another.
+
+FILE_CHECKS: Dict[str, List[Tuple[str, str]]] = {
+    "src/eopt/net_gateway.py": [
+        ("GATEWAY_CLASS", r"class\s+NetGateway\b"),
+        ("GATEWAY_ROBOTS", r"urllib\.robotparser"),
+        ("GATEWAY_HTTPX", r"httpx\.Client"),
+    ],
+    "tools/phase1/phase1_oilbot.py": [
+        ("UNLOCK_CALL_MISSING", r"def\s+operator_unlock_once\("),
+        ("FLIP_FN_MISSING", r"def\s+should_flip_to_archive\("),
+        ("AH_HELPER", r"def\s+_ah_paginate_allowed\("),
+        ("AH_CALL", r"_ah_paginate_allowed\(\s*page\s*,\s*target_url"),
+        ("CR_STAMP_FN", r"def\s+_profile_store_stamp_path\("),
+        ("CR_STAMP_USE", r"marker\s*=\s*_profile_store_stamp_path\(ret\.code\)"),
+        ("CR_ENSURE_FN", r"_ensure_store_selected\("),
+    ],
+    "tools/phase1/utils_playwright.py": [
+        ("PW_CONTEXT", r"new_context\("),
+        ("PW_LOCALE", r"locale\s*=\s*['\"]nl-[NLBE]{2}['\"]|locale\s*=\s*['\"]nl-NL['\"]"),
+        ("PW_TZ", r"timezone_id\s*=\s*['\"]Europe/Amsterdam['\"]"),
+        ("PW_UA", r"user_agent\s*=\s*['\"][^'\"]*EOPT/1\.0"),
+        ("PW_DNT", r"extra_http_headers\s*=\s*\{[^\}]*['\"]DNT['\"]\s*:\s*['\"]1['\"]"),
+        ("PW_REF", r"set_extra_http_headers\(\s*\{[^\}]*['\"]Referer['\"]"),
+    ],
+    "tools/phase1/selector_wizard.py": [
+        ("WIZ_WINS", r"REQUIRED_WINS\s*=\s*2"),
+        ("WIZ_PROMOTE", r"def\s+maybe_promote\("),
+        ("WIZ_GATE_CARDS", r"cards\s*>=\s*5"),
+        ("WIZ_GATE_PRICE", r"price.*>=\s*0?\.70"),
+        ("WIZ_GATE_QTY", r"qty.*>=\s*0?\.50"),
+        ("WIZ_GATE_DUP", r"dup.*<=\s*0?\.20"),
+    ],
+}
+
+
+def _compile_file_checks(flags=re.DOTALL) -> Dict[str, Tuple[re.Pattern, List[Tuple[str, re.Pattern]]]]:
+    out = {}
+    for rel, checks in FILE_CHECKS.items():
+        alt = "|".join(f"(?P<{code}>{pat})" for code, pat in checks)
+        out[rel] = (re.compile(f"(?=(?:{alt}))", flags), [(code, re.compile(pat, flags)) for code, pat in checks])
+    return out
+
+
+_FILE_RX = _compile_file_checks()
+
+
+@lru_cache(maxsize=64)
+def file_hits(root: Path, rel: str) -> frozenset:
+    """Codes from FILE_CHECKS[rel] whose pattern occurs in root/rel."""
+    combined, singles = _FILE_RX[rel]
+    txt = read_text_safe(root / rel)
+    seen = set()
+    for m in combined.finditer(txt):
+        seen.add(m.lastgroup)
+        if len(seen) == len(singles):
+            break
+    for code, rx in singles:
+        if code not in seen and rx.search(txt):
+            seen.add(code)
+    return frozenset(seen)
 
 
 def csv_rows(path: Path) -> Tuple[List[str], List[Dict[str, str]]]:
@@ -99,12 +168,12 @@ def check_net_gateway(root: Path, log: Logger):
         log.add("P2", "GATEWAY_MISSING", "robots-aware NetGateway not found (src/eopt/net_gateway.py).",
                 str(fp), "Create per playbook; switch archive/CDX helpers to use it (httpx + robots).")
         return
-    txt = read_text_safe(fp)
-    if not has(txt, r"class\s+NetGateway\b"):
+    found = file_hits(root, "src/eopt/net_gateway.py")
+    if "GATEWAY_CLASS" not in found:
         log.add("P2", "GATEWAY_CLASS", "NetGateway class missing.", str(fp), "Define NetGateway with robots + rate limit.")
-    if not has(txt, r"urllib\.robotparser"):
+    if "GATEWAY_ROBOTS" not in found:
         log.add("P2", "GATEWAY_ROBOTS", "Robots parser not referenced.", str(fp), "Use urllib.robotparser.RobotFileParser.")
-    if not has(txt, r"httpx\.Client"):
+    if "GATEWAY_HTTPX" not in found:
         log.add("P3", "GATEWAY_HTTPX", "httpx client not detected.", str(fp), "Use httpx.Client(..., follow_redirects=True).")
 
 
@@ -119,15 +188,14 @@ def check_unlock_helper(root: Path, log: Logger):
     if not bot:
         log.add("P1", "PHASE1_MISSING", "phase1_oilbot.py not found.", str(fp_bot))
         return
-    if not has(bot, r"def\s+operator_unlock_once\("):
+    if "UNLOCK_CALL_MISSING" not in file_hits(root, "tools/phase1/phase1_oilbot.py"):
         log.add("P3", "UNLOCK_CALL_MISSING", "operator_unlock_once(...) function not defined.", str(fp_bot),
                 "Add the cooldowned unlock helper wrap; call only when needed.")
 
 
 def check_flip_controller(root: Path, log: Logger):
     fp = root / "tools/phase1/phase1_oilbot.py"
-    txt = read_text_safe(fp)
-    if not has(txt, r"def\s+should_flip_to_archive\("):
+    if "FLIP_FN_MISSING" not in file_hits(root, "tools/phase1/phase1_oilbot.py"):
         log.add("P3", "FLIP_FN_MISSING", "should_flip_to_archive(...) not found.", str(fp),
                 "Add unified early-flip decision (CF/auth/store/empty-after-attempts).")
 
@@ -137,19 +205,19 @@ def check_utils_playwright_headers(root: Path, log: Logger):
     if not exists(fp):
         log.add("P2", "UTILS_MISSING", "utils_playwright.py not found.", str(fp))
         return
-    txt = read_text_safe(fp)
-    if not has(txt, r"new_context\("):
+    found = file_hits(root, "tools/phase1/utils_playwright.py")
+    if "PW_CONTEXT" not in found:
         log.add("P2", "PW_CONTEXT", "browser.new_context(...) not detected.", str(fp))
-    if not has(txt, r"locale\s*=\s*['\"]nl-[NLBE]{2}['\"]") and not has(txt, r"locale\s*=\s*['\"]nl-NL['\"]"):
+    if "PW_LOCALE" not in found:
         log.add("P3", "PW_LOCALE", "Locale nl-NL/nl-BE not detected on context.", str(fp),
                 "Set locale='nl-NL' (and nl-BE where applicable).")
-    if not has(txt, r"timezone_id\s*=\s*['\"]Europe/Amsterdam['\"]"):
+    if "PW_TZ" not in found:
         log.add("P3", "PW_TZ", "Timezone Europe/Amsterdam not detected.", str(fp))
-    if not has(txt, r"user_agent\s*=\s*['\"][^'\"]*EOPT/1\.0"):
+    if "PW_UA" not in found:
         log.add("P3", "PW_UA", "User-Agent not set to EOPT/1.0 (+compliance; polite).", str(fp))
-    if not has(txt, r"extra_http_headers\s*=\s*\{[^\}]*['\"]DNT['\"]\s*:\s*['\"]1['\"]"):
+    if "PW_DNT" not in found:
         log.add("P3", "PW_DNT", "DNT header not set on context.", str(fp))
-    if not has(txt, r"set_extra_http_headers\(\s*\{[^\}]*['\"]Referer['\"]"):
+    if "PW_REF" not in found:
         log.add("P3", "PW_REF", "Referer header not set via context.set_extra_http_headers(...).", str(fp),
                 "Set Referer to a realistic source (e.g., DuckDuckGo search).")
 
@@ -220,24 +288,24 @@ def check_retailers_csv(root: Path, log: Logger):
 
 def check_ah_pagination(root: Path, log: Logger):
     fp = root / "tools/phase1/phase1_oilbot.py"
-    txt = read_text_safe(fp)
-    if not has(txt, r"def\s+_ah_paginate_allowed\("):
+    found = file_hits(root, "tools/phase1/phase1_oilbot.py")
+    if "AH_HELPER" not in found:
         log.add("P2", "AH_HELPER", "_ah_paginate_allowed(...) helper missing.", str(fp),
                 "Insert AH pagination helper using ?page=N&withOffset=true only.")
-    if not has(txt, r"_ah_paginate_allowed\(\s*page\s*,\s*target_url"):
+    if "AH_CALL" not in found:
         log.add("P2", "AH_CALL", "AH pagination helper not called for ah_nl.", str(fp),
                 "Wrap category visit for ah_nl in _ah_paginate_allowed(...).")
 
 
 def check_colruyt_store_marker(root: Path, log: Logger):
     fp = root / "tools/phase1/phase1_oilbot.py"
-    txt = read_text_safe(fp)
-    if not has(txt, r"def\s+_profile_store_stamp_path\("):
+    found = file_hits(root, "tools/phase1/phase1_oilbot.py")
+    if "CR_STAMP_FN" not in found:
         log.add("P2", "CR_STAMP_FN", "_profile_store_stamp_path(...) missing.", str(fp),
                 "Store-selected marker should live under _pw_profile/<code>/.store_selected")
-    if not has(txt, r"marker\s*=\s*_profile_store_stamp_path\(ret\.code\)"):
+    if "CR_STAMP_USE" not in found:
         log.add("P2", "CR_STAMP_USE", "Colruyt store marker not used when selecting a store.", str(fp))
-    if not has(txt, r"_ensure_store_selected\("):
+    if "CR_ENSURE_FN" not in found:
         log.add("P3", "CR_ENSURE_FN", "_ensure_store_selected(...) helper not found.", str(fp))
 
 
@@ -247,12 +315,12 @@ def check_selector_wizard(root: Path, log: Logger):
         log.add("P3", "WIZ_MISSING", "selector_wizard.py not found (optional guardrails).", str(fp),
                 "Add wizard with REQUIRED_WINS=2 and gate thresholds.")
         return
-    txt = read_text_safe(fp)
-    if not has(txt, r"REQUIRED_WINS\s*=\s*2"):
+    found = file_hits(root, "tools/phase1/selector_wizard.py")
+    if "WIZ_WINS" not in found:
         log.add("P3", "WIZ_WINS", "Selector wizard REQUIRED_WINS != 2.", str(fp))
-    if not has(txt, r"def\s+maybe_promote\("):
+    if "WIZ_PROMOTE" not in found:
         log.add("P3", "WIZ_PROMOTE", "maybe_promote(...) not found.", str(fp))
-    if not has(txt, r"cards\s*>=\s*5") or not has(txt, r"price.*>=\s*0?\.70") or not has(txt, r"qty.*>=\s*0?\.50") or not has(txt, r"dup.*<=\s*0?\.20"):
+    if not {"WIZ_GATE_CARDS", "WIZ_GATE_PRICE", "WIZ_GATE_QTY", "WIZ_GATE_DUP"} <= found:
         log.add("P3", "WIZ_GATES", "Gates not detected (cards>=5, price>=70%, qty>=50%, dup<=20%).", str(fp))
 
 
@@ -281,25 +349,42 @@ def check_seed_savepagenow(root: Path, log: Logger):
 
 # ---------- main orchestration
 
-def run_checks(root: Path, out_prefix: str) -> Tuple[Path, Path]:
-    log = Logger()
+CHECKS = (
     # 1) gateway & unlock & flip
-    check_net_gateway(root, log)
-    check_unlock_helper(root, log)
-    check_flip_controller(root, log)
+    check_net_gateway,
+    check_unlock_helper,
+    check_flip_controller,
     # 2) playwright headers
-    check_utils_playwright_headers(root, log)
+    check_utils_playwright_headers,
     # 3) retailers.csv deltas
-    check_retailers_csv(root, log)
+    check_retailers_csv,
     # 4) AH & Colruyt specifics
-    check_ah_pagination(root, log)
-    check_colruyt_store_marker(root, log)
+    check_ah_pagination,
+    check_colruyt_store_marker,
     # 5) selector wizard
-    check_selector_wizard(root, log)
+    check_selector_wizard,
     # 6) exporter quarantine + backfill
-    check_exporter_quarantine_and_backfill(root, log)
+    check_exporter_quarantine_and_backfill,
     # 7) optional helper
-    check_seed_savepagenow(root, log)
+    check_seed_savepagenow,
+)
+
+
+def run_checks(root: Path, out_prefix: str) -> Tuple[Path, Path]:
+    read_text_safe.cache_clear()
+    exists.cache_clear()
+    file_hits.cache_clear()
+    log = Logger()
+    # Checks only read files and record issues, so they run concurrently.
+    # Each gets its own Logger; issues are merged back in CHECKS order so
+    # the reports stay deterministic.
+    parts = [Logger() for _ in CHECKS]
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = [ex.submit(check, root, part) for check, part in zip(CHECKS, parts)]
+        for fut in futures:
+            fut.result()
+    for part in parts:
+        log.issues.extend(part.issues)
 
     txt_path, json_path = log.dump(out_prefix)
     c = log.counts()
@@ -2,16 +2,35 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
 import importlib
 import json
 import os
 import re
 import sqlite3
 import sys
+import threading
 import time
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# --- import shim so "tools.*" works when run directly ---
+_root = Path(__file__).resolve().parents[2]  # project root
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+# -------------------------------------------------------
+
+from tools.common import dir_names, json_dumps_pretty, path_exists
+
+try:  # optional: whole-file export validation in one columnar C pass
+    import pyarrow as pa  # type: ignore
+    import pyarrow.csv as pacsv  # type: ignore
+except ImportError:
+    pa = None
 
 # ---------- config ----------
 EXPECTED = {
@@ -42,10 +61,25 @@ EXPECTED = {
     ],
 }
 
-WEBSITE_ID_RX = re.compile(r"^[a-z]{2}:[a-z0-9.-]+\.[a-z.]+$")
+WEBSITE_ID_RX = re.compile(r"[a-z]{2}:[a-z0-9.-]+\.[a-z.]+", re.ASCII)
+
+# Registry vocabularies and required discovery CSV columns
+_CLASSES = frozenset({"grocery", "beauty", "pharmacy", "marketplace"})
+_PRIORITIES = frozenset({"must_cover", "long_tail"})
+_ROBOTS = frozenset({"allowed", "blocked", "review", ""})
+_REG_FIELDS = ("website_id", "country", "site_domain", "retailer_class", "priority", "robots_status")
+_DISC_MUST = frozenset({"country", "site_domain", "website_id", "relevance_score", "robots_status"})
+
+# Threads for the per-file manifest / discovery CSV checks (I/O + parse bound)
+SCAN_WORKERS = min(8, os.cpu_count() or 1)
+
+# Parsed-YAML sidecars (see _yaml_cache_load), relative to the repo root
+YAML_CACHE_DIR = "reports/.yaml_cache"
+# Per-file check results replayed on unchanged files (see ScanState)
+SCAN_STATE_PATH = "reports/.scan_state.json"
 
 # ---------- helpers ----------
-@dataclass
+@dataclass(slots=True)
 class Issue:
     severity: str  # P1 | P2 | P3
     code: str
@@ -53,18 +87,34 @@ class Issue:
     path: Optional[str] = None
     extra: Optional[Dict[str, Any]] = None
 
+_ISSUE_FIELDS = tuple(f.name for f in fields(Issue))
+
+def issue_dict(i: Issue) -> Dict[str, Any]:
+    return {k: getattr(i, k) for k in _ISSUE_FIELDS}
+
 def add(issues: List[Issue], sev: str, code: str, msg: str, path: Optional[Path] = None, **extra):
     issues.append(Issue(severity=sev, code=code, message=msg, path=str(path) if path else None, extra=extra or None))
 
-def read_text_safe(p: Path) -> Optional[str]:
+@lru_cache(maxsize=256)
+def _read_text_cached(p: str, mtime_ns: int) -> Optional[str]:
     try:
-        return p.read_text(encoding="utf-8")
+        with open(p, encoding="utf-8") as fh:
+            return fh.read()
     except Exception:
         try:
-            return p.read_text(encoding="utf-8", errors="ignore")
+            with open(p, encoding="utf-8", errors="ignore") as fh:
+                return fh.read()
         except Exception:
             return None
 
+def read_text_safe(p: Path) -> Optional[str]:
+    # Keyed by mtime so an edited file is re-read within the same process
+    try:
+        mtime_ns = os.stat(p).st_mtime_ns
+    except OSError:
+        return None
+    return _read_text_cached(str(p), mtime_ns)
+
 def try_import(modname: str) -> Tuple[bool, Optional[str]]:
     try:
         importlib.import_module(modname)
@@ -72,28 +122,138 @@ def try_import(modname: str) -> Tuple[bool, Optional[str]]:
     except Exception as e:
         return False, repr(e)
 
-def try_yaml_load(p: Path) -> Tuple[Optional[Any], Optional[str]]:
+def _yaml_safe_loader(yaml: Any) -> Any:
+    # libyaml's C loader when PyYAML was built with it (flagged as YAML_NO_C otherwise)
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _yaml_cache_load(p: Path, cache_dir: Path) -> Any:
+    """Safe-load p as YAML, memoized in a JSON sidecar keyed by mtime + size.
+
+    Documents that do not survive a JSON round trip unchanged (dates,
+    non-string keys, ...) are parsed every time rather than cached.
+    """
+    import yaml  # type: ignore
+    st = p.stat()
+    key = hashlib.blake2b(str(p.resolve()).encode("utf-8"), digest_size=10).hexdigest()
+    side = cache_dir / f"{key}.json"
+    try:
+        cached = json.loads(side.read_text(encoding="utf-8"))
+        if cached.get("mtime") == st.st_mtime_ns and cached.get("size") == st.st_size:
+            return cached["data"]
+    except Exception:
+        pass
+    data = yaml.load(read_text_safe(p) or "", Loader=_yaml_safe_loader(yaml))
+    try:
+        blob = json.dumps({"mtime": st.st_mtime_ns, "size": st.st_size, "data": data})
+        if json.loads(blob)["data"] == data:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            side.write_text(blob, encoding="utf-8")
+    except (TypeError, ValueError, OSError):
+        pass
+    return data
+
+def try_yaml_load(p: Path, cache_dir: Optional[Path] = None) -> Tuple[Optional[Any], Optional[str]]:
     try:
         import yaml  # type: ignore
     except Exception as e:
         return None, f"PyYAML missing: {e}"
     try:
-        return yaml.safe_load(read_text_safe(p) or "") or ({} if p.suffix == ".yaml" else None), None
+        if cache_dir is not None:
+            data = _yaml_cache_load(p, cache_dir)
+        else:
+            data = yaml.load(read_text_safe(p) or "", Loader=_yaml_safe_loader(yaml))
+        return data or ({} if p.suffix == ".yaml" else None), None
     except Exception as e:
         return None, f"YAML parse error: {e}"
 
+def _names_like(d: Path, prefix: str = "", suffix: str = "") -> List[Path]:
+    """Entries of d matching prefix*suffix, in listing order (unsorted: the
+    reports are sorted once in write_reports)."""
+    return [d / n for n in (dir_names(d) or ()) if n.startswith(prefix) and n.endswith(suffix)]
+
 def glob_many(root: Path, pattern: str) -> List[Path]:
     return sorted(root.glob(pattern))
 
+class ScanState:
+    """Per-file check results from the previous run (reports/.scan_state.json).
+
+    A file whose (mtime_ns, size) is unchanged replays its stored issues and
+    payload instead of being checked again. The whole state is dropped when
+    the scanner's source or rule vocabularies, or the installed PyYAML, change.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tag = self._tag()
+        self.entries: Dict[str, Any] = {}
+        self.fresh: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("tag") == self.tag:
+                self.entries = data.get("files") or {}
+        except Exception:
+            pass
+
+    def _tag(self) -> str:
+        # Content, not mtime: a checkout that restores an older scanner must
+        # not replay results produced by a newer one (or vice versa)
+        try:
+            me_key = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=10).hexdigest()
+        except OSError:
+            me_key = "?"
+        rules = repr((sorted(_CLASSES), sorted(_PRIORITIES), sorted(_ROBOTS), _REG_FIELDS, sorted(_DISC_MUST)))
+        me_key += ":" + hashlib.blake2b(rules.encode("utf-8"), digest_size=6).hexdigest()
+        try:
+            import yaml  # type: ignore
+            y = f"{yaml.__version__}:{hasattr(yaml, 'CSafeLoader')}"
+        except Exception:
+            y = "none"
+        return f"{self.VERSION}|{me_key}|{y}"
+
+    def cached(self, p: Path, fn: Callable[[Path], Tuple[List[Issue], Any]],
+               st: Optional[os.stat_result] = None) -> Tuple[List[Issue], Any]:
+        """fn(p) -> (issues, JSON-serialisable payload), replayed when p is unchanged.
+
+        st may be passed in (e.g. from a DirEntry) to avoid a second stat.
+        """
+        if st is None:
+            try:
+                st = p.stat()
+            except OSError:
+                return fn(p)
+        key = str(p)
+        ent = self.entries.get(key)
+        if ent and ent.get("mtime") == st.st_mtime_ns and ent.get("size") == st.st_size:
+            found, payload = [Issue(**d) for d in ent["issues"]], ent.get("payload")
+        else:
+            found, payload = fn(p)
+            ent = {"mtime": st.st_mtime_ns, "size": st.st_size,
+                   "issues": [issue_dict(i) for i in found], "payload": payload}
+        with self.lock:
+            self.fresh[key] = ent
+        return found, payload
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"tag": self.tag, "files": self.fresh}), encoding="utf-8")
+        except OSError:
+            pass
+
 # ---------- checks ----------
 def check_presence(root: Path, issues: List[Issue]) -> None:
+    # Plain string joins: no PurePath object per expected entry
+    root_s = str(root) + os.sep
     for rel in EXPECTED["dirs"]:
-        p = root / rel
-        if not p.exists():
+        p = root_s + rel
+        if not path_exists(p):
             add(issues, "P2", "DIR_MISSING", f"Directory missing: {rel}", p)
     for rel in EXPECTED["phase1_files"] + EXPECTED["phase2_files"]:
-        p = root / rel
-        if not p.exists():
+        p = root_s + rel
+        if not path_exists(p):
             sev = "P1" if "src/eopt/ids.py" in rel or "seed_registry.py" in rel else "P2"
             add(issues, sev, "FILE_MISSING", f"File missing: {rel}", p)
 
@@ -106,6 +266,8 @@ def check_imports_and_ids(root: Path, issues: List[Issue]) -> None:
     ok, err = try_import("yaml")
     if not ok:
         add(issues, "P2", "DEP_MISSING", "PyYAML not installed (needed to parse registry/manifests). Install PyYAML.", extra={"import_error": err})
+    elif not hasattr(importlib.import_module("yaml"), "CSafeLoader"):
+        add(issues, "P2", "YAML_NO_C", "PyYAML has no libyaml bindings (CSafeLoader); manifests parse with the slow pure-Python loader. Reinstall PyYAML with libyaml.")
     # Make src importable for this process
     if str(root / "src") not in sys.path:
         sys.path.append(str(root / "src"))
@@ -130,7 +292,7 @@ def check_sql_migration(root: Path, issues: List[Issue]) -> None:
     if "CREATE TABLE" not in sql or "websites" not in sql:
         add(issues, "P2", "DDL_WEBSITES", "websites DDL file found but does not create a 'websites' table", ddl)
 
-def check_db(root: Path, issues: List[Issue], db_path: Optional[str]) -> None:
+def check_db(root: Path, issues: List[Issue], db_path: Optional[str], immutable: bool = False) -> None:
     if not db_path:
         # default path
         dbp = root / "data/eopt.sqlite"
@@ -140,27 +302,40 @@ def check_db(root: Path, issues: List[Issue], db_path: Optional[str]) -> None:
         add(issues, "P3", "DB_ABSENT", f"Database not found at {dbp}. That's fine if you haven't created it yet.", dbp)
         return
     try:
-        conn = sqlite3.connect(str(dbp))
+        # URI read-only open: no write lock or journal setup; immutable=1 also
+        # skips locking/WAL probing and is only safe if nothing writes the DB
+        uri = dbp.resolve().as_uri() + "?mode=ro" + ("&immutable=1" if immutable else "")
+        conn = sqlite3.connect(uri, uri=True)
         cur = conn.cursor()
+        # Read-only inspection: never write, map the file, keep temp work in RAM
+        cur.execute("PRAGMA query_only=ON")
+        cur.execute("PRAGMA mmap_size=268435456")
+        cur.execute("PRAGMA cache_size=-16000")
+        cur.execute("PRAGMA temp_store=MEMORY")
         tables = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
         if "websites" not in tables:
             add(issues, "P2", "DB_WEBSITES_MISSING", "Database exists but 'websites' table missing. Re-run migrate_002_websites.py.", dbp)
-        # Optional: columns check for rows/snapshots
+        # Optional: columns check for rows/snapshots (one query for both)
+        table_cols: Dict[str, set] = {}
+        for tname, col in cur.execute(
+            "SELECT m.name, p.name FROM sqlite_master m, pragma_table_info(m.name) p "
+            "WHERE m.type='table' AND m.name IN ('rows', 'snapshots')"
+        ):
+            table_cols.setdefault(tname, set()).add(col)
         for tname in ("rows", "snapshots"):
             if tname in tables:
-                cols = [r[1] for r in cur.execute(f"PRAGMA table_info({tname})").fetchall()]
-                if "website_id" not in cols:
+                if "website_id" not in table_cols.get(tname, ()):
                     add(issues, "P2", "DB_COL_MISSING", f"Table {tname} missing website_id column", dbp, table=tname)
         conn.close()
     except Exception as e:
         add(issues, "P1", "DB_OPEN_FAIL", f"Failed to open SQLite DB: {e}", dbp)
 
-def check_registry_and_manifests(root: Path, issues: List[Issue]) -> None:
+def check_registry_and_manifests(root: Path, issues: List[Issue], state: Optional[ScanState] = None) -> None:
     reg = root / "retailers/registry.yaml"
     if not reg.exists():
         add(issues, "P2", "REGISTRY_MISSING", "retailers/registry.yaml not found (run seed_registry.py)")
         return
-    data, err = try_yaml_load(reg)
+    data, err = try_yaml_load(reg, root / YAML_CACHE_DIR)
     if err:
         add(issues, "P1", "REGISTRY_PARSE", err, reg)
         return
@@ -170,14 +345,16 @@ def check_registry_and_manifests(root: Path, issues: List[Issue]) -> None:
     # Validate entries
     seen_ids = set()
     seen_pair = set()
+    get_fields = itemgetter(*_REG_FIELDS)
     for i, row in enumerate(data, 1):
-        wid = str(row.get("website_id", ""))
-        country = str(row.get("country", ""))
-        dom = str(row.get("site_domain", "")).lower()
-        klass = row.get("retailer_class", "")
-        priority = row.get("priority", "")
-        robots = row.get("robots_status", "")
-        if not WEBSITE_ID_RX.match(wid):
+        try:
+            wid, country, dom, klass, priority, robots = get_fields(row)
+        except KeyError:
+            wid, country, dom, klass, priority, robots = (row.get(k, "") for k in _REG_FIELDS)
+        wid = str(wid)
+        country = str(country)
+        dom = str(dom).lower()
+        if not WEBSITE_ID_RX.fullmatch(wid):
             add(issues, "P1", "REGISTRY_ID_SHAPE", f"Invalid website_id '{wid}' at entry {i}", reg, entry=i)
         if (country, dom) in seen_pair:
             add(issues, "P1", "REGISTRY_DUP_DOMAIN", f"Duplicate (country,site_domain) {country},{dom}", reg)
@@ -185,82 +362,126 @@ def check_registry_and_manifests(root: Path, issues: List[Issue]) -> None:
         if wid in seen_ids:
             add(issues, "P1", "REGISTRY_DUP_ID", f"Duplicate website_id {wid}", reg)
         seen_ids.add(wid)
-        if klass not in {"grocery", "beauty", "pharmacy", "marketplace"}:
+        if klass not in _CLASSES:
             add(issues, "P2", "REGISTRY_CLASS", f"Invalid retailer_class '{klass}' for {wid}", reg)
-        if priority not in {"must_cover", "long_tail"}:
+        if priority not in _PRIORITIES:
             add(issues, "P2", "REGISTRY_PRIORITY", f"Invalid priority '{priority}' for {wid}", reg)
-        if robots not in {"allowed", "blocked", "review", ""}:
+        if robots not in _ROBOTS:
             add(issues, "P2", "REGISTRY_ROBOTS", f"robots_status should be allowed|blocked|review (got '{robots}')", reg)
 
     # Manifests
     mdir = root / "manifests"
-    files = sorted(mdir.glob("*.yaml"))
+    # One scandir for names and sizes; the DirEntry stat is reused below
+    try:
+        with os.scandir(mdir) as it:
+            files = [(Path(e.path), e.stat()) for e in it if e.name.endswith(".yaml")]
+    except OSError:
+        files = []
     if len(files) < 27:
         add(issues, "P2", "MANIFEST_COUNT", f"Found {len(files)} manifests (<27).")
-    for mf in files:
-        doc, err2 = try_yaml_load(mf)
-        if err2:
-            add(issues, "P1", "MANIFEST_PARSE", f"{err2}", mf)
-            continue
-        if not isinstance(doc, dict):
-            add(issues, "P1", "MANIFEST_SHAPE", "Manifest must be a YAML mapping (dict)", mf)
-            continue
-        if not doc.get("country"):
-            add(issues, "P1", "MANIFEST_COUNTRY", "Missing 'country'", mf)
-        if not doc.get("must_cover"):
-            add(issues, "P1", "MANIFEST_MUST", "Missing or empty 'must_cover' list", mf)
-        if "gates" not in doc:
-            add(issues, "P2", "MANIFEST_GATES", "Missing 'gates' section", mf)
-
-def check_discovery_outputs(root: Path, issues: List[Issue]) -> None:
-    cands = sorted((root / "discovery").glob("candidates_*.csv"))
+    cache_dir = root / YAML_CACHE_DIR
+
+    def run(item: Tuple[Path, os.stat_result]) -> Tuple[List[Issue], Any]:
+        mf, st = item
+
+        def one(p: Path) -> Tuple[List[Issue], Any]:
+            return _check_one_manifest(p, cache_dir, st.st_size), None
+
+        return one(mf) if state is None else state.cached(mf, one, st)
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as ex:
+        for found, _ in ex.map(run, files):
+            issues.extend(found)
+
+def _check_one_manifest(mf: Path, cache_dir: Path, size: Optional[int] = None) -> List[Issue]:
+    issues: List[Issue] = []
+    if size == 0:
+        # An empty .yaml loads as {} (see try_yaml_load): validate without parsing
+        doc, err2 = {}, None
+    else:
+        doc, err2 = try_yaml_load(mf, cache_dir)
+    if err2:
+        add(issues, "P1", "MANIFEST_PARSE", f"{err2}", mf)
+        return issues
+    if not isinstance(doc, dict):
+        add(issues, "P1", "MANIFEST_SHAPE", "Manifest must be a YAML mapping (dict)", mf)
+        return issues
+    if not doc.get("country"):
+        add(issues, "P1", "MANIFEST_COUNTRY", "Missing 'country'", mf)
+    if not doc.get("must_cover"):
+        add(issues, "P1", "MANIFEST_MUST", "Missing or empty 'must_cover' list", mf)
+    if "gates" not in doc:
+        add(issues, "P2", "MANIFEST_GATES", "Missing 'gates' section", mf)
+    return issues
+
+def check_discovery_outputs(root: Path, issues: List[Issue], state: Optional[ScanState] = None) -> None:
+    cands = _names_like(root / "discovery", "candidates_", ".csv")
     if not cands:
         add(issues, "P3", "DISCOVERY_EMPTY", "No discovery candidates CSVs found (run tools/discovery/discover.py).")
+    # One set across all files, merged in file order, so a domain listed in
+    # two candidates files counts as a duplicate too.
+    seen: set = set()
     dup_count = 0
-    for fp in cands:
-        try:
-            with fp.open("r", encoding="utf-8") as fh:
-                rd = csv.DictReader(fh)
-                cols = set(rd.fieldnames or [])
-                must = {"country","site_domain","website_id","relevance_score","robots_status"}
-                missing = must - cols
-                if missing:
-                    add(issues, "P2", "DISCOVERY_COLS", f"{fp.name} missing columns: {sorted(missing)}", fp)
-                seen = set()
-                hi = 0
-                for row in rd:
-                    sd = (row.get("site_domain","") or "").lower()
-                    if sd in seen:
-                        dup_count += 1
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as ex:
+        run = _check_one_candidates if state is None else (lambda fp: state.cached(fp, _check_one_candidates))
+        for found, domains in ex.map(run, cands):
+            issues.extend(found)
+            for sd in domains:
+                if sd in seen:
+                    dup_count += 1
+                else:
                     seen.add(sd)
-                    try:
-                        if float(row.get("relevance_score", 0)) >= 0.7:
-                            hi += 1
-                    except Exception:
-                        pass
-                # Informative thresholds only for BE/NL demo
-                if fp.name.endswith("_BE.csv") or fp.name.endswith("_NL.csv"):
-                    if hi < 5:
-                        add(issues, "P2", "DISCOVERY_THRESHOLD", f"{fp.name}: high-confidence (<0.7) count {hi} (<5)", fp)
-        except Exception as e:
-            add(issues, "P1", "DISCOVERY_READ", f"Failed to read {fp.name}: {e}", fp)
     if dup_count > 0:
         add(issues, "P2", "DISCOVERY_DUP", f"Duplicates detected across discovery files: {dup_count}")
 
     # Proposed diffs exist?
     pr = root / "discovery/proposed_registry_diff.yaml"
-    if not pr.exists():
+    if not path_exists(pr):
         add(issues, "P3", "DISCOVERY_DIFF_REG", "proposed_registry_diff.yaml not found (expected after discovery).")
     pm = root / "discovery/proposed_manifests_diff"
-    if not pm.exists():
+    if not path_exists(pm):
         add(issues, "P3", "DISCOVERY_DIFF_MAN", "proposed_manifests_diff/ not found.")
 
+def _check_one_candidates(fp: Path) -> Tuple[List[Issue], List[str]]:
+    """Issues for one candidates_*.csv plus its (lower-cased) site_domains."""
+    issues: List[Issue] = []
+    domains: List[str] = []
+    try:
+        with fp.open("r", encoding="utf-8") as fh:
+            rd = csv.reader(fh)
+            header = next(rd, [])
+            idx = {h: i for i, h in enumerate(header)}
+            missing = _DISC_MUST - idx.keys()
+            if missing:
+                add(issues, "P2", "DISCOVERY_COLS", f"{fp.name} missing columns: {sorted(missing)}", fp)
+            sd_i = idx.get("site_domain")
+            rs_i = idx.get("relevance_score")
+            hi = 0
+            for row in rd:
+                if not row:
+                    continue
+                n = len(row)
+                domains.append(row[sd_i].lower() if sd_i is not None and sd_i < n else "")
+                if rs_i is not None and rs_i < n:
+                    try:
+                        if float(row[rs_i]) >= 0.7:
+                            hi += 1
+                    except ValueError:
+                        pass
+            # Informative thresholds only for BE/NL demo
+            if fp.name.endswith("_BE.csv") or fp.name.endswith("_NL.csv"):
+                if hi < 5:
+                    add(issues, "P2", "DISCOVERY_THRESHOLD", f"{fp.name}: high-confidence (<0.7) count {hi} (<5)", fp)
+    except Exception as e:
+        add(issues, "P1", "DISCOVERY_READ", f"Failed to read {fp.name}: {e}", fp)
+    return issues, domains
+
 def check_exports(root: Path, issues: List[Issue]) -> None:
     exp_dir = root / "exports"
     if not exp_dir.exists():
         add(issues, "P3", "EXPORTS_DIR", "exports/ directory not present (no runs yet).")
         return
-    csvs = sorted(exp_dir.glob("*.csv"))
+    csvs = _names_like(exp_dir, suffix=".csv")
     if not csvs:
         add(issues, "P3", "EXPORTS_EMPTY", "No final export CSVs found in exports/.")
         return
@@ -277,6 +498,7 @@ def check_exports(root: Path, issues: List[Issue]) -> None:
                     add(issues, "P2", "EXPORT_HEADER", f"{fp.name} header != {expected} (got {header})", fp)
                 # Light sanity sample
                 rows_checked = 0
+                truncated = False
                 for row in rd:
                     if len(row) != 4:
                         add(issues, "P2", "EXPORT_COLCOUNT", f"{fp.name} has a row with {len(row)} columns (expected 4)", fp)
@@ -288,37 +510,65 @@ def check_exports(root: Path, issues: List[Issue]) -> None:
                         break
                     rows_checked += 1
                     if rows_checked >= 25:
+                        truncated = True
                         break
+            # Sample passed on a longer file: with pyarrow, check all of it
+            if not truncated or pa is None or [h.strip() for h in header] != expected:
+                continue
+            err = _arrow_export_error(fp)
+            if err:
+                code = "EXPORT_COLCOUNT" if "columns" in err else "EXPORT_PRICE"
+                add(issues, "P2", code, f"{fp.name} fails full-file check: {err}", fp)
         except Exception as e:
             add(issues, "P1", "EXPORT_READ", f"Failed to read export {fp.name}: {e}", fp)
 
+def _arrow_export_error(fp: Path) -> Optional[str]:
+    """Parse fp with pyarrow, price_eur as float64 (empty is not null, as
+    with float()); returns the first error or None."""
+    try:
+        pacsv.read_csv(
+            fp,
+            read_options=pacsv.ReadOptions(block_size=1 << 20),
+            convert_options=pacsv.ConvertOptions(
+                column_types={"price_eur": pa.float64()},
+                null_values=[],
+                include_columns=["price_eur"],
+            ),
+        )
+    except pa.ArrowInvalid as e:
+        return str(e).strip()
+    return None
+
 def check_phase1_logs(root: Path, issues: List[Issue]) -> None:
     log_root = root / "logs"
-    runs = sorted(log_root.glob("run_*"))
+    runs = _names_like(log_root, "run_")
     if not runs:
         add(issues, "P3", "LOGS_EMPTY", "No run_* directories found under logs/ (haven't run phase1 yet?).")
         return
-    # Spot-check each retailer dir for listing artifact presence
-    for r in runs:
-        for store_dir in sorted(r.glob("*")):
-            if not store_dir.is_dir():
-                continue
-            h = store_dir / "listing.html"
-            p = store_dir / "listing.png"
-            rcsv = store_dir / "rows.csv"
-            if not h.exists():
-                add(issues, "P3", "LISTING_HTML_MISSING", f"Missing listing.html in {store_dir.name}", h)
-            if not p.exists():
-                add(issues, "P3", "LISTING_PNG_MISSING", f"Missing listing.png in {store_dir.name}", p)
-            if not rcsv.exists():
-                add(issues, "P2", "ROWS_CSV_MISSING", f"Missing rows.csv in {store_dir.name}", rcsv)
+    # Spot-check each retailer dir for listing artifact presence; one scandir
+    # per run and per store dir, using the DirEntry type instead of a stat.
+    for run in runs:
+        try:
+            with os.scandir(run) as it:
+                store_dirs = [e.name for e in it if e.is_dir()]
+        except OSError:
+            continue
+        for name in store_dirs:
+            store_dir = run / name
+            present = dir_names(store_dir) or frozenset()
+            if "listing.html" not in present:
+                add(issues, "P3", "LISTING_HTML_MISSING", f"Missing listing.html in {name}", store_dir / "listing.html")
+            if "listing.png" not in present:
+                add(issues, "P3", "LISTING_PNG_MISSING", f"Missing listing.png in {name}", store_dir / "listing.png")
+            if "rows.csv" not in present:
+                add(issues, "P2", "ROWS_CSV_MISSING", f"Missing rows.csv in {name}", store_dir / "rows.csv")
 
 def check_discovery_config(root: Path, issues: List[Issue]) -> None:
     cfgp = root / "discovery/config.yaml"
     if not cfgp.exists():
         add(issues, "P2", "DISCOVERY_CFG_MISSING", "discovery/config.yaml missing (used by discover.py).")
         return
-    cfg, err = try_yaml_load(cfgp)
+    cfg, err = try_yaml_load(cfgp, root / YAML_CACHE_DIR)
     if err:
         add(issues, "P1", "DISCOVERY_CFG_PARSE", err, cfgp)
         return
@@ -338,31 +588,34 @@ def write_reports(root: Path, issues: List[Issue], out_prefix: Optional[str]) ->
     out_dir = root / "reports"
     out_dir.mkdir(parents=True, exist_ok=True)
     base = f"{out_prefix}_" if out_prefix else ""
+    # Scans walk directories in listing order; sort here so reports are stable
+    issues = sorted(issues, key=lambda i: (i.severity, i.code, i.path or "", i.message))
     json_path = out_dir / f"{base}scan_report_{ts}.json"
     txt_path = out_dir / f"{base}scan_report_{ts}.txt"
 
-    # JSON
+    # JSON (Issue holds only flat fields, so a shallow dict needs no deep copy)
+    s = summarize(issues)
     payload = {
-        "summary": summarize(issues),
-        "issues": [asdict(i) for i in issues],
+        "summary": s,
+        "issues": [issue_dict(i) for i in issues],
     }
-    json_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    json_path.write_bytes(json_dumps_pretty(payload))
 
-    # TXT
-    lines = []
-    s = summarize(issues)
-    lines.append("# Repo Scan Report\n")
-    lines.append(f"Total: {s['total']}  |  P1: {s['P1']}  P2: {s['P2']}  P3: {s['P3']}\n")
-    lines.append("----\n")
+    # TXT: issues are already sorted by severity, so each block is one slice
+    lines = [
+        "# Repo Scan Report\n",
+        f"Total: {s['total']}  |  P1: {s['P1']}  P2: {s['P2']}  P3: {s['P3']}\n",
+        "----\n",
+    ]
     for sev in ("P1", "P2", "P3"):
-        block = [i for i in issues if i.severity == sev]
-        if not block: 
+        if not s[sev]:
             continue
         lines.append(f"## {sev} issues\n")
-        for i in block:
-            path = f" [{i.path}]" if i.path else ""
-            extra = f" | extra={i.extra}" if i.extra else ""
-            lines.append(f"- ({i.code}) {i.message}{path}{extra}")
+        lines += [
+            f"- ({i.code}) {i.message}"
+            f"{f' [{i.path}]' if i.path else ''}{f' | extra={i.extra}' if i.extra else ''}"
+            for i in issues if i.severity == sev
+        ]
         lines.append("")
     txt_path.write_text("\n".join(lines), encoding="utf-8")
 
@@ -382,23 +635,27 @@ def main():
     ap.add_argument("--db", default=None, help="Path to SQLite DB (default: data/eopt.sqlite)")
     ap.add_argument("--out-prefix", default="phase",
                     help="Prefix for report filenames (default: 'phase')")
+    ap.add_argument("--immutable", action="store_true",
+                    help="Open the DB with immutable=1 (only if nothing is writing to it)")
     args = ap.parse_args()
 
     root = Path(".").resolve()
     issues: List[Issue] = []
+    state = ScanState(root / SCAN_STATE_PATH)
 
     # Checks
     check_presence(root, issues)
     check_pythonpath(root, issues)
     check_imports_and_ids(root, issues)
     check_sql_migration(root, issues)
-    check_db(root, issues, args.db)
-    check_registry_and_manifests(root, issues)
+    check_db(root, issues, args.db, args.immutable)
+    check_registry_and_manifests(root, issues, state)
     check_discovery_config(root, issues)
-    check_discovery_outputs(root, issues)
+    check_discovery_outputs(root, issues, state)
     check_exports(root, issues)
     check_phase1_logs(root, issues)
 
+    state.save()
     j, t = write_reports(root, issues, args.out_prefix)
     s = summarize(issues)
     print(f"[SCAN] Done. P1={s['P1']} P2={s['P2']} P3={s['P3']} | Reports → {t}  &  {j}")
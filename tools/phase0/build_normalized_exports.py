@@ -1,13 +1,30 @@
 #!/usr/bin/env python3
 # tools/phase0/build_normalized_exports.py
 from __future__ import annotations
-import hashlib, json, os, re, sqlite3, sys
+import hashlib, json, mmap, os, re, sqlite3, sys
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import pandas as pd
 
+# --- import shim so "tools.*" works when run directly ---
+_root = Path(__file__).resolve().parents[2]  # project root
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+# -------------------------------------------------------
+
+from tools.common import json_dumps_pretty
+
+# xlsxwriter is a write-only engine and much faster than openpyxl; optional
+try:
+    import xlsxwriter  # noqa: F401
+    _XLSX_ENGINE, _XLSX_KWARGS = "xlsxwriter", {"options": {"strings_to_urls": False}}
+except ImportError:
+    _XLSX_ENGINE, _XLSX_KWARGS = "openpyxl", {}
+
 # ---------- paths ----------
 RUNS_DIR = Path("logs")
 EXPORTS = Path("exports")
@@ -24,8 +41,8 @@ CANON_COLS = [
 ]
 
 # ---------- helpers ----------
+@lru_cache(maxsize=200_000)
 def _root_domain(u: str) -> str:
-    from urllib.parse import urlparse
     host = urlparse(u or "").netloc
     if not host:
         return ""
@@ -38,6 +55,11 @@ def _safe_float(x) -> Optional[float]:
     except Exception:
         return None
 
+def _safe_float_col(s: pd.Series) -> pd.Series:
+    """_safe_float over a whole column; unparseable values become NaN."""
+    t = s.astype("string").str.replace("\u00a0", " ", regex=False).str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(t, errors="coerce").astype("float64")
+
 _QTY_RX = re.compile(r"(\d+(?:[.,]\d+)?)\s*([a-zA-Z]+)")
 _PACK_RX = re.compile(r"(\d+)\s*[x×]")
 
@@ -58,13 +80,17 @@ def parse_qty(q: str) -> Tuple[Optional[float], Optional[str], Optional[int]]:
     unit = (m.group(2) or "").lower()
     return val, unit, pack
 
+# liters = value / divisor, per lower-cased unit
+_UNIT_DIVISOR: Dict[str, float] = {
+    **dict.fromkeys(("l","lt","liter","litre","liters","litres"), 1.0),
+    **dict.fromkeys(("ml","milliliter","millilitre","milliliters","millilitres"), 1000.0),
+    "cl": 100.0,
+}
+
 def liters_from(val: Optional[float], unit: Optional[str]) -> Optional[float]:
     if val is None or not unit: return None
-    u = unit.lower()
-    if u in ("l","lt","liter","litre","liters","litres"): return val
-    if u in ("ml","milliliter","millilitre","milliliters","millilitres"): return val/1000.0
-    if u in ("cl",): return val/100.0
-    return None
+    d = _UNIT_DIVISOR.get(unit.lower())
+    return val / d if d else None
 
 def unit_price_per_l(val: Optional[float], unit: Optional[str], price: Optional[float]) -> Optional[float]:
     L = liters_from(val, unit)
@@ -72,33 +98,67 @@ def unit_price_per_l(val: Optional[float], unit: Optional[str], price: Optional[
         return round(price / L, 4)
     return None
 
+def _str_col(df: pd.DataFrame, col: str) -> pd.Series:
+    """df[col] as str with missing values as "" (the `row.get(col) or ""` idiom)."""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    s = df[col]
+    return s.where(s.notna(), "").astype(str)
+
+def _none_if_missing(s: pd.Series) -> pd.Series:
+    """Object Series with NaN replaced by None, as the per-row helpers returned."""
+    return s.astype(object).where(s.notna(), None)
+
 def sha256_file(path: Path) -> str:
     h = hashlib.sha256()
     with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
+        try:
+            # whole file in one update over the page cache
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        except (ValueError, OSError):  # empty or unmappable file
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
     return h.hexdigest()
 
 # ---------- retailer lookup (domain/country by code OR chain) ----------
-def load_retailer_lookup() -> Dict[str, Dict[str,str]]:
-    by_code: Dict[str, Dict[str,str]] = {}
-    by_chain: Dict[str, Dict[str,str]] = {}
+# (code->domain, code->country, code->name, chain->domain, chain->country, chain->code)
+RetailerMaps = Tuple[Dict[str,str], Dict[str,str], Dict[str,str], Dict[str,str], Dict[str,str], Dict[str,str]]
+
+def load_retailer_lookup() -> RetailerMaps:
+    """Flat lower-cased lookups for Series.map; a key whose (last) CSV row has
+    an empty value is left out of that map."""
     for candidate in [Path("retailers.csv"), Path("retailers/retailers.csv"), Path("retailers/registry.csv")]:
-        if not candidate.exists():
-            continue
-        df = pd.read_csv(candidate).fillna("")
-        for _, r in df.iterrows():
-            code = (r.get("code") or r.get("retailer") or "").strip()
-            chain = (r.get("name") or r.get("chain") or r.get("retailer") or "").strip()
-            base = (r.get("base_url") or r.get("category_url") or "").strip()
-            domain = _root_domain(base)
-            country = (r.get("country") or "").strip().upper()
-            if code:
-                by_code[code.lower()] = {"domain": domain, "country": country, "name": chain}
-            if chain:
-                by_chain[chain.lower()] = {"domain": domain, "country": country, "code": code}
-        break
-    return by_code, by_chain
+        if candidate.exists():
+            return _retailer_lookup(str(candidate.resolve()), candidate.stat().st_mtime_ns)
+    return {}, {}, {}, {}, {}, {}
+
+def _col_or(df: pd.DataFrame, *cols: str) -> pd.Series:
+    """Row-wise `r.get(c1) or r.get(c2) or ""` over the columns that exist."""
+    out = pd.Series("", index=df.index, dtype=object)
+    for c in reversed(cols):
+        if c in df.columns:
+            v = df[c].astype(str)
+            out = v.where(v != "", out)
+    return out
+
+def _flat_maps(key: pd.Series, values: Dict[str, pd.Series]) -> List[Dict[str,str]]:
+    """One {key.lower(): value} dict per values column; the last row of a key
+    wins, then empty values are dropped."""
+    t = pd.DataFrame({"_k": key.str.lower(), **values})[key != ""].drop_duplicates("_k", keep="last")
+    return [dict(zip(t["_k"][t[c] != ""], t[c][t[c] != ""])) for c in values]
+
+@lru_cache(maxsize=1)
+def _retailer_lookup(path: str, mtime_ns: int) -> RetailerMaps:
+    # keyed by mtime so an edited CSV is re-read; callers must not mutate the dicts
+    df = pd.read_csv(path).fillna("")
+    code = _col_or(df, "code", "retailer").str.strip()
+    chain = _col_or(df, "name", "chain", "retailer").str.strip()
+    domain = _col_or(df, "base_url", "category_url").str.strip().map(_root_domain)
+    country = _col_or(df, "country").str.strip().str.upper()
+    code_domain, code_country, code_name = _flat_maps(code, {"domain": domain, "country": country, "name": chain})
+    chain_domain, chain_country, chain_code = _flat_maps(chain, {"domain": domain, "country": country, "code": code})
+    return code_domain, code_country, code_name, chain_domain, chain_country, chain_code
 
 # ---------- read Phase-1 rows ----------
 def read_phase1_rows(run_id: str) -> pd.DataFrame:
@@ -118,78 +178,54 @@ def read_phase1_rows(run_id: str) -> pd.DataFrame:
 
 # ---------- normalization ----------
 def enrich_and_normalize(df: pd.DataFrame, run_id: str) -> pd.DataFrame:
-    df = df.copy()
-    by_code, by_chain = load_retailer_lookup()
+    """Canonical-column frame for one run. Columns are derived on `df` itself
+    (no defensive copy): pass a frame you do not reuse, as main() does."""
+    # flat dict lookups, applied column-wise with Series.map
+    code_to_domain, code_to_country, _, chain_to_domain, chain_to_country, chain_to_code = load_retailer_lookup()
+    chain_lc = _str_col(df, "chain").str.lower()
 
     # backfill retailer_code from chain if missing
-    def fill_retailer_code(row) -> Optional[str]:
-        code = (row.get("retailer_code") or "").strip()
-        if code: return code
-        ch = (row.get("chain") or "").strip().lower()
-        if ch in by_chain and by_chain[ch].get("code"): return by_chain[ch]["code"]
-        return None
-    df["retailer_code"] = df.apply(fill_retailer_code, axis=1)
+    code = _str_col(df, "retailer_code").str.strip()
+    code = code.where(code != "", chain_lc.str.strip().map(chain_to_code))
+    df["retailer_code"] = _none_if_missing(code)
+    code_lc = code.fillna("").str.lower()
 
     # derive site_domain (prefer URL, else code, else chain)
-    def derive_site_domain(row) -> str:
-        url_dom = _root_domain(row.get("source_url") or "")
-        if url_dom: return url_dom
-        code = (row.get("retailer_code") or "").lower()
-        if code and code in by_code and by_code[code].get("domain"): return by_code[code]["domain"]
-        ch = (row.get("chain") or "").lower()
-        if ch and ch in by_chain and by_chain[ch].get("domain"): return by_chain[ch]["domain"]
-        return ""
-    df["site_domain"] = df.apply(derive_site_domain, axis=1)
+    src = _str_col(df, "source_url")
+    uniq = src.unique()  # URLs repeat across a retailer's rows: parse each once
+    url_dom = src.map(dict(zip(uniq, map(_root_domain, uniq))))
+    by_lookup = code_lc.map(code_to_domain).fillna(chain_lc.map(chain_to_domain)).fillna("")
+    df["site_domain"] = url_dom.where(url_dom != "", by_lookup)
 
     # derive country (prefer provided, else code suffix, else lookup)
-    def derive_country(row) -> Optional[str]:
-        cur = (row.get("country") or "").strip().upper() or None
-        if cur: return cur
-        code = (row.get("retailer_code") or "").lower()
-        if code.endswith("_be"): return "BE"
-        if code.endswith("_nl"): return "NL"
-        if code and code in by_code and by_code[code].get("country"): return by_code[code]["country"]
-        ch = (row.get("chain") or "").lower()
-        if ch and ch in by_chain and by_chain[ch].get("country"): return by_chain[ch]["country"]
-        return None
-    df["country"] = df.apply(derive_country, axis=1)
-
-    # iso2 for website_id
-    def iso_from_row(row) -> str:
-        if row.get("country"): return row["country"]
-        code = (row.get("retailer_code") or "").lower()
-        if code.endswith("_be"): return "BE"
-        if code.endswith("_nl"): return "NL"
-        return "XX"
-    df["iso2"] = df.apply(iso_from_row, axis=1)
-
-    # website_id
-    def make_website_id(site_domain: str, iso2: str) -> Optional[str]:
-        if site_domain:
-            return f"{iso2}:{site_domain}"
-        return None
-    df["website_id"] = [make_website_id(sd, iso) for sd, iso in zip(df["site_domain"], df["iso2"])]
-
-    # --- normalize website_id: blank → None ---
-    df["website_id"] = df["website_id"].apply(
-        lambda x: (x.strip() if isinstance(x, str) and x.strip() else None)
-    )
-
-    # quantities
-    vals, units, packs = [], [], []
-    for q in df.get("quantity","").astype(str).tolist():
-        v,u,p = parse_qty(q)
-        vals.append(v); units.append(u); packs.append(p)
-    df["net_qty_value"] = vals
-    df["net_qty_unit"]  = [u if u else None for u in units]
+    country = _str_col(df, "country").str.strip().str.upper()
+    by_suffix = pd.Series("", index=df.index).mask(code_lc.str.endswith("_be"), "BE").mask(code_lc.str.endswith("_nl"), "NL")
+    country = country.where(country != "", by_suffix)
+    by_lookup = code_lc.map(code_to_country).fillna(chain_lc.map(chain_to_country)).fillna("")
+    country = country.where(country != "", by_lookup)
+    df["country"] = _none_if_missing(country.mask(country == ""))
+
+    # iso2 for website_id (country already falls back to the code suffix)
+    df["iso2"] = country.where(country != "", "XX")
+
+    # website_id (blank → None)
+    website_id = (df["iso2"] + ":" + df["site_domain"]).str.strip()
+    df["website_id"] = _none_if_missing(website_id.mask(df["site_domain"] == ""))
+
+    # quantities (same first matches as parse_qty, extracted column-wise)
+    qty = df["quantity"].astype(str)
+    qe = qty.str.extract(_QTY_RX.pattern)
+    val = pd.to_numeric(qe[0].str.replace(".", "", regex=False).str.replace(",", ".", regex=False), errors="coerce")
+    unit = qe[1].str.lower()
+    df["net_qty_value"] = val
+    df["net_qty_unit"]  = _none_if_missing(unit)
     # pack_count as nullable Int64 for stable merges
-    df["pack_count"]    = pd.Series(packs, dtype="Int64")
+    df["pack_count"]    = pd.to_numeric(qty.str.extract(_PACK_RX.pattern)[0], errors="coerce").astype("Int64")
 
     # price + unit price
-    df["price_eur"] = df["price_eur"].apply(_safe_float)
-    df["unit_price_eur_per_l"] = [
-        unit_price_per_l(v, u, p) for v,u,p in zip(df["net_qty_value"], df["net_qty_unit"], df["price_eur"])
-    ]
+    df["price_eur"] = price = _safe_float_col(df["price_eur"])
+    liters = val / unit.map(_UNIT_DIVISOR)
+    df["unit_price_eur_per_l"] = (price / liters).where(liters > 0).round(4)
 
     # ensure columns
     df["run_id"] = run_id
@@ -198,15 +234,13 @@ def enrich_and_normalize(df: pd.DataFrame, run_id: str) -> pd.DataFrame:
     df["timestamp_utc"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
     # minimal store_context_json
-    def make_ctx(row: pd.Series) -> str:
-        ctx = {
-            "website_id": row.get("website_id"),
-            "robots_status": row.get("robots_status"),
-            "mode": row.get("mode"),
-            "source_domain": row.get("site_domain"),
-        }
-        return json.dumps(ctx, ensure_ascii=False)
-    df["store_context_json"] = df.apply(make_ctx, axis=1)
+    df["store_context_json"] = [
+        json.dumps({"website_id": w, "robots_status": r, "mode": m, "source_domain": d}, ensure_ascii=False)
+        for w, r, m, d in zip(df["website_id"], df["robots_status"], df["mode"], df["site_domain"])
+    ]
+
+    # low-cardinality labels as category (smaller long-lived MASTER frames)
+    df = _as_category(df, ("retailer_code","net_qty_unit","mode","robots_status"))
 
     # keep canonical order
     for c in CANON_COLS:
@@ -215,15 +249,49 @@ def enrich_and_normalize(df: pd.DataFrame, run_id: str) -> pd.DataFrame:
     return df[CANON_COLS]
 
 # ---------- Excel helpers ----------
+def _as_category(df: pd.DataFrame, cols: Iterable[str]) -> pd.DataFrame:
+    """df with cols cast to category (group keys hash as int codes)."""
+    todo = {c: "category" for c in cols if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)}
+    return df.astype(todo) if todo else df
+
 def pivot_country_chain(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty: return pd.DataFrame(columns=["country","chain","rows","avg_price_eur","id_rate"])
-    tmp = df.assign(has_id=df["ean"].notna() | df["sku"].notna())
-    gp = tmp.groupby(["country","chain"], dropna=False)
+    tmp = _as_category(df, ("country","chain")).assign(has_id=df["ean"].notna() | df["sku"].notna())
+    gp = tmp.groupby(["country","chain"], dropna=False, observed=True)
     return gp.agg(rows=("product_name","size"), avg_price_eur=("price_eur","mean"), id_rate=("has_id","mean")).reset_index()
 
 def coverage(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty: return pd.DataFrame(columns=["country","chain","rows"])
-    return df.groupby(["country","chain"], dropna=False).size().reset_index(name="rows")
+    g = _as_category(df, ("country","chain"))
+    return g.groupby(["country","chain"], dropna=False, observed=True).size().reset_index(name="rows")
+
+_SUM_COLS = ["country","chain","rows","sum_price","n_price","sum_has_id"]
+
+def _country_chain_sums(df: pd.DataFrame) -> pd.DataFrame:
+    """Additive per (country, chain) totals behind Coverage and the pivot, so
+    the master summaries can be carried forward run to run."""
+    if df.empty: return pd.DataFrame(columns=_SUM_COLS)
+    tmp = _as_category(df, ("country","chain")).assign(has_id=df["ean"].notna() | df["sku"].notna())
+    gp = tmp.groupby(["country","chain"], dropna=False, observed=True)
+    return gp.agg(rows=("product_name","size"), sum_price=("price_eur","sum"), n_price=("price_eur","count"),
+                  sum_has_id=("has_id","sum")).reset_index()
+
+def _add_sums(prev: pd.DataFrame, cur: pd.DataFrame) -> pd.DataFrame:
+    if prev.empty: return cur
+    if cur.empty: return prev
+    both = pd.concat([prev.astype({"country": object, "chain": object}),
+                      cur.astype({"country": object, "chain": object})], ignore_index=True)
+    return both.groupby(["country","chain"], dropna=False).sum().reset_index()
+
+def _summaries_from_sums(sums: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(Coverage, Pivots_Country_Chain) from _country_chain_sums totals."""
+    if sums.empty:
+        return pd.DataFrame(columns=["country","chain","rows"]), pd.DataFrame(columns=["country","chain","rows","avg_price_eur","id_rate"])
+    piv = sums[["country","chain","rows"]].assign(
+        avg_price_eur=sums["sum_price"].where(sums["n_price"] > 0) / sums["n_price"],
+        id_rate=sums["sum_has_id"] / sums["rows"],
+    )
+    return sums[["country","chain","rows"]], piv
 
 def _coerce_change_keys(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
@@ -241,38 +309,129 @@ def changes(prev_all: Optional[pd.DataFrame], cur_all: pd.DataFrame) -> pd.DataF
     cols = ["retailer_code","product_name","net_qty_value","net_qty_unit","pack_count","price_eur"]
     if prev_all is None or prev_all.empty or cur_all.empty:
         return pd.DataFrame(columns=["retailer_code","product_name","net_qty_value","net_qty_unit","pack_count","prev_price","cur_price","delta"])
-    A = _coerce_change_keys(prev_all[cols].copy()).rename(columns={"price_eur":"prev_price"})
-    B = _coerce_change_keys(cur_all[cols].copy()).rename(columns={"price_eur":"cur_price"})
+    A = _coerce_change_keys(prev_all[cols]).rename(columns={"price_eur":"prev_price"})
+    B = _coerce_change_keys(cur_all[cols]).rename(columns={"price_eur":"cur_price"})
     keys = ["retailer_code","product_name","net_qty_value","net_qty_unit","pack_count"]
+    # Build-side reduction: only history rows whose key occurs this run can
+    # match; the inner merge keeps A's order, so the result is unchanged
+    A = A.merge(B[keys].drop_duplicates(), on=keys, how="inner")
     merged = pd.merge(B, A, on=keys, how="left")
     merged["delta"] = merged["cur_price"] - merged["prev_price"]
     return merged.sort_values(by="delta", ascending=False)
 
+def _upl_out_of_bounds(df: pd.DataFrame) -> pd.Series:
+    """Rows whose unit price is outside 1..200 EUR/L; missing prices are in bounds
+    (NaN compares False, so no separate notna pass)."""
+    upl = pd.to_numeric(df["unit_price_eur_per_l"], errors="coerce").to_numpy(dtype="float64", na_value=float("nan"))
+    return pd.Series((upl < 1) | (upl > 200), index=df.index)
+
 def qa_sheet(df: pd.DataFrame) -> pd.DataFrame:
-    issues: List[Dict[str,Any]] = []
-    for i, r in df.iterrows():
-        if not r.get("website_id"):
-            issues.append({"row": i, "issue": "website_id null", "source_url": r["source_url"], "retailer_code": r["retailer_code"]})
-        if r["unit_price_eur_per_l"] is not None and not (1 <= r["unit_price_eur_per_l"] <= 200):
-            issues.append({"row": i, "issue": "unit price out of bounds", "value": r["unit_price_eur_per_l"], "name": r["product_name"]})
-        if pd.isna(r["product_name"]) or str(r["product_name"]).strip()=="":
-            issues.append({"row": i, "issue": "missing product_name"})
-    return pd.DataFrame(issues)
+    wid = df["website_id"]
+    name = df["product_name"]
+    # (mask, issue, output column -> source column), one boolean mask per issue class
+    checks = [
+        (wid.isna() | (wid == ""), "website_id null", {"source_url": "source_url", "retailer_code": "retailer_code"}),
+        # a missing unit price is flagged too (NaN is not None)
+        (df["unit_price_eur_per_l"].isna() | _upl_out_of_bounds(df), "unit price out of bounds",
+         {"value": "unit_price_eur_per_l", "name": "product_name"}),
+        (name.isna() | (name.astype(str).str.strip() == ""), "missing product_name", {}),
+    ]
+    pos = pd.Series(range(len(df)), index=df.index)
+    parts = [
+        pd.DataFrame({
+            "_pos": pos[m].to_numpy(), "_k": k, "row": df.index[m.to_numpy()], "issue": issue,
+            **{out: df.loc[m, col].to_numpy() for out, col in cols.items()},
+        })
+        for k, (m, issue, cols) in enumerate(checks)
+    ]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame()
+    # columns in order of first appearance, as a frame built from the issue dicts
+    parts.sort(key=lambda p: (p["_pos"].iat[0], p["_k"].iat[0]))
+    # keep the per-row grouping of the QA sheet: row order, then check order
+    qa = pd.concat(parts, ignore_index=True).sort_values(["_pos", "_k"], kind="stable")
+    return qa.drop(columns=["_pos", "_k"]).reset_index(drop=True)
 
 def suspect_sheet(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty: return pd.DataFrame(columns=df.columns)
-    return df[(df["unit_price_eur_per_l"].notna()) & ((df["unit_price_eur_per_l"] < 1) | (df["unit_price_eur_per_l"] > 200))].copy()
+    return df[_upl_out_of_bounds(df)]
+
+def _excel_writer(path: Path) -> pd.ExcelWriter:
+    # No constant_memory: to_excel writes column by column, which that mode
+    # (row-at-a-time flushing) would silently truncate
+    return pd.ExcelWriter(path, engine=_XLSX_ENGINE, engine_kwargs=_XLSX_KWARGS)
+
+def _read_master_all(master: Path, master_pq: Path) -> Optional[pd.DataFrame]:
+    """Accumulated All_Data, or None without a master workbook. The Parquet copy
+    is written right after the workbook, so it is used only while it is at
+    least as new; a workbook rewritten elsewhere is read directly."""
+    if not master.exists():
+        return None
+    if master_pq.exists() and master_pq.stat().st_mtime_ns >= master.stat().st_mtime_ns:
+        try:
+            return pd.read_parquet(master_pq)
+        except Exception:  # no parquet engine, or unreadable: use the workbook
+            pass
+    all_df = _read_sheet_values(master, "All_Data")
+    return all_df if all_df is not None else pd.DataFrame(columns=CANON_COLS)
+
+def _read_sheet_values(path: Path, sheet: str) -> Optional[pd.DataFrame]:
+    """One sheet as a frame via openpyxl's streaming reader (cell values only,
+    no styles, other sheets untouched); None when the sheet is absent."""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet not in wb.sheetnames:
+            return None
+        rows = wb[sheet].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        # read_excel skips blank rows too
+        body = [r for r in rows if any(v is not None for v in r)]
+    finally:
+        wb.close()
+    return pd.DataFrame(body, columns=list(header)).infer_objects()
+
+def _write_master_parquet(all_df: pd.DataFrame, master_pq: Path) -> None:
+    try:
+        all_df.to_parquet(master_pq, compression="zstd", index=False)
+    except Exception:
+        # no parquet engine, or mixed-type columns: drop any stale copy so the
+        # next run reads the workbook
+        master_pq.unlink(missing_ok=True)
+
+def _read_master_sums(master: Path, sums_pq: Path) -> Optional[pd.DataFrame]:
+    """Running Coverage/pivot totals matching the master workbook, or None when
+    missing or older than the workbook (same freshness rule as the Parquet copy)."""
+    if not (master.exists() and sums_pq.exists()):
+        return None
+    if sums_pq.stat().st_mtime_ns < master.stat().st_mtime_ns:
+        return None
+    try:
+        return pd.read_parquet(sums_pq)
+    except Exception:
+        return None
+
+def _write_master_sums(sums: pd.DataFrame, sums_pq: Path) -> None:
+    try:
+        sums.to_parquet(sums_pq, index=False)
+    except Exception:
+        sums_pq.unlink(missing_ok=True)
 
 def write_weekly_master(df: pd.DataFrame, run_id: str) -> Tuple[Path, Path]:
     weekly = EXPORTS / f"oils-prices_{run_id}.xlsx"
     master = EXPORTS / "oils-prices_MASTER.xlsx"
+    master_pq = EXPORTS / "oils-prices_MASTER.parquet"
+    sums_pq = EXPORTS / "oils-prices_MASTER_country_chain.parquet"
 
     cov = coverage(df)
     piv = pivot_country_chain(df)
     sus = suspect_sheet(df)
     qa  = qa_sheet(df)
 
-    with pd.ExcelWriter(weekly, engine="openpyxl") as xw:
+    with _excel_writer(weekly) as xw:
         df.to_excel(xw, sheet_name="All_Data", index=False)
         cov.to_excel(xw, sheet_name="Coverage", index=False)
         piv.to_excel(xw, sheet_name="Pivots_Country_Chain", index=False)
@@ -282,23 +441,30 @@ def write_weekly_master(df: pd.DataFrame, run_id: str) -> Tuple[Path, Path]:
             xw, sheet_name="Changes", index=False
         )
 
-    if master.exists():
-        md = pd.read_excel(master, sheet_name=None)
-        all_old = md.get("All_Data", pd.DataFrame(columns=CANON_COLS))
+    all_old = _read_master_all(master, master_pq)
+    prev_sums = _read_master_sums(master, sums_pq)
+    if all_old is not None:
         all_new = pd.concat([all_old, df], ignore_index=True)
+        # Coverage/pivot: carry last run's totals forward and add this run's
+        # groups; recount the whole history only when the totals are unusable
+        if prev_sums is not None:
+            sums = _add_sums(prev_sums, _country_chain_sums(df))
+        else:
+            sums = _country_chain_sums(all_new)
+        cov_all, piv_all = _summaries_from_sums(sums)
         try:
             chg = changes(all_old, df)
         except Exception:
             chg = pd.DataFrame(columns=["retailer_code","product_name","net_qty_value","net_qty_unit","pack_count","prev_price","cur_price","delta"])
-        with pd.ExcelWriter(master, engine="openpyxl") as xw:
+        with _excel_writer(master) as xw:
             all_new.to_excel(xw, sheet_name="All_Data", index=False)
-            coverage(all_new).to_excel(xw, sheet_name="Coverage", index=False)
-            pivot_country_chain(all_new).to_excel(xw, sheet_name="Pivots_Country_Chain", index=False)
+            cov_all.to_excel(xw, sheet_name="Coverage", index=False)
+            piv_all.to_excel(xw, sheet_name="Pivots_Country_Chain", index=False)
             suspect_sheet(all_new).to_excel(xw, sheet_name="Suspect", index=False)
             qa_sheet(all_new).to_excel(xw, sheet_name="QA", index=False)
             chg.to_excel(xw, sheet_name="Changes", index=False)
     else:
-        with pd.ExcelWriter(master, engine="openpyxl") as xw:
+        with _excel_writer(master) as xw:
             df.to_excel(xw, sheet_name="All_Data", index=False)
             cov.to_excel(xw, sheet_name="Coverage", index=False)
             piv.to_excel(xw, sheet_name="Pivots_Country_Chain", index=False)
@@ -307,6 +473,10 @@ def write_weekly_master(df: pd.DataFrame, run_id: str) -> Tuple[Path, Path]:
             pd.DataFrame(columns=["retailer_code","product_name","net_qty_value","net_qty_unit","pack_count","prev_price","cur_price","delta"]).to_excel(
                 xw, sheet_name="Changes", index=False
             )
+        all_new = df
+        sums = _country_chain_sums(df)
+    _write_master_parquet(all_new, master_pq)
+    _write_master_sums(sums, sums_pq)
     return weekly, master
 
 # ---------- SQLite with FKs ----------
@@ -344,78 +514,88 @@ CREATE UNIQUE INDEX IF NOT EXISTS uq_prices ON prices(run_id, retailer_code, pro
 CREATE INDEX IF NOT EXISTS ix_prices_country_chain ON prices(country, chain, timestamp_utc);
 """
 
+def _sql_rows(frame: pd.DataFrame) -> List[tuple]:
+    """frame's rows as tuples of plain Python values (NaN/NA -> None) for executemany."""
+    cols = [frame[c].astype(object).where(frame[c].notna(), None).tolist() for c in frame.columns]
+    return list(zip(*cols))
+
 def upsert_sqlite(df: pd.DataFrame):
+    """Append df's FK-valid rows to prices (websites upserted first). `df` is
+    only read: the normalized website_id/site_domain live in separate Series."""
     db = DATA / "eopt.sqlite"
     con = sqlite3.connect(db)
-    cur = con.cursor()
-
-    # Always enable FK checks for THIS connection
-    cur.execute("PRAGMA foreign_keys = ON;")
-
-    # Create/upgrade schema
-    for stmt in SCHEMA_SQL.strip().split(";"):
-        s = stmt.strip()
-        if s:
-            cur.execute(s)
-    con.commit()
-
-    # Normalize website_id consistently (strip spaces, uppercase ISO)
-    def _norm_webid(x: Optional[str]) -> Optional[str]:
-        if not isinstance(x, str):
-            return None
-        x = x.strip()
-        if not x:
-            return None
-        if ":" in x:
-            iso, dom = x.split(":", 1)
-            return f"{(iso or '').upper()}:{(dom or '').strip().lower()}"
-        return x
-
-    df = df.copy()
-    df["website_id"] = df["website_id"].apply(_norm_webid)
-    df["site_domain"] = df["site_domain"].astype(str).str.strip().str.lower()
-
-    # 1) Upsert websites
-    web_rows = (
-        df[["website_id","site_domain"]]
-        .dropna(subset=["website_id"])
-        .drop_duplicates()
-        .rename(columns={"site_domain":"domain"})
-        .assign(iso2=lambda x: x["website_id"].str.split(":").str[0])
-    )
-
-    for _, row in web_rows.iterrows():
-        cur.execute(
-            "INSERT OR IGNORE INTO websites(website_id, domain, iso2) VALUES (?,?,?)",
-            (row["website_id"], row["domain"], row["iso2"]),
+    try:
+        cur = con.cursor()
+
+        # Always enable FK checks for THIS connection
+        cur.execute("PRAGMA foreign_keys = ON;")
+        # Bulk-load settings; all per-connection (the DB's journal mode is left alone)
+        cur.executescript("PRAGMA temp_store=MEMORY; PRAGMA cache_size=-65536; PRAGMA mmap_size=268435456;")
+
+        # Create/upgrade schema
+        for stmt in SCHEMA_SQL.strip().split(";"):
+            s = stmt.strip()
+            if s:
+                cur.execute(s)
+
+        # Normalize website_id consistently (strip spaces, uppercase ISO, lower domain)
+        wid = df["website_id"].astype("string").str.strip()
+        parts = wid.str.extract(r"^([^:]*):(.*)$", flags=re.S)  # iso, domain (NaN without ":")
+        wid = (parts[0].str.upper() + ":" + parts[1].str.strip().str.lower()).where(parts[1].notna(), wid)
+        wid = _none_if_missing(wid.mask(wid == ""))
+        dom = df["site_domain"].astype(str).str.strip().str.lower()
+
+        web_rows = (
+            pd.DataFrame({"website_id": wid, "domain": dom})
+            .dropna(subset=["website_id"])
+            .drop_duplicates()
+            .assign(iso2=lambda x: x["website_id"].str.split(":").str[0])
         )
-    con.commit()
-
-    # 2) Validate FKs BEFORE inserting prices
-    cur.execute("SELECT website_id FROM websites")
-    valid_webids = {r[0] for r in cur.fetchall()}
-
-    prices_df = df.dropna(subset=["website_id"]).copy()
-    mask_valid = prices_df["website_id"].isin(valid_webids)
-    bad = prices_df.loc[~mask_valid, ["website_id","site_domain","source_url"]].drop_duplicates()
-
-    if not bad.empty:
-        # Write a small debug file to help diagnose
-        debug_path = EXPORTS / "_debug_missing_webids.csv"
-        bad.to_csv(debug_path, index=False, encoding="utf-8")
-        print(f"[WARN] {len(bad)} row(s) reference website_id not present in websites. "
-              f"Details → {debug_path}")
 
-    # Keep only FK-valid rows
-    prices_df = prices_df.loc[mask_valid].copy()
-
-    # 3) Insert prices safely
-    if not prices_df.empty:
-        prices_df.to_sql("prices", con, if_exists="append", index=False)
-    else:
-        print("[WARN] No FK-valid price rows to insert.")
+        # Websites and prices go in one transaction: committed together on
+        # success, rolled back together on any error (e.g. a duplicate price row)
+        with con:
+            # 1) Upsert websites
+            cur.executemany(
+                "INSERT OR IGNORE INTO websites(website_id, domain, iso2) VALUES (?,?,?)",
+                list(zip(web_rows["website_id"], web_rows["domain"], web_rows["iso2"])),
+            )
 
-    con.close()
+            # 2) Validate FKs BEFORE inserting prices
+            cur.execute("SELECT website_id FROM websites")
+            valid_webids = {r[0] for r in cur.fetchall()}
+
+            has_wid = wid.notna()
+            mask_valid = has_wid & wid.isin(valid_webids)
+            mask_bad = has_wid & ~mask_valid
+            bad = pd.DataFrame({
+                "website_id": wid[mask_bad], "site_domain": dom[mask_bad], "source_url": df.loc[mask_bad, "source_url"],
+            }).drop_duplicates()
+
+            if not bad.empty:
+                # Write a small debug file to help diagnose
+                debug_path = EXPORTS / "_debug_missing_webids.csv"
+                bad.to_csv(debug_path, index=False, encoding="utf-8")
+                print(f"[WARN] {len(bad)} row(s) reference website_id not present in websites. "
+                      f"Details → {debug_path}")
+
+            # Keep only FK-valid rows: take() gives a fresh frame (the one copy), so
+            # the normalized columns are set on it without touching df
+            keep = mask_valid.to_numpy().nonzero()[0]
+            prices_df = df.take(keep)
+            prices_df["website_id"] = wid.to_numpy()[keep]
+            prices_df["site_domain"] = dom.to_numpy()[keep]
+
+            # 3) Insert prices safely (executemany on this connection, so inside
+            # the transaction; to_sql would manage and commit its own)
+            if not prices_df.empty:
+                cols = ", ".join(prices_df.columns)
+                marks = ", ".join("?" * len(prices_df.columns))
+                cur.executemany(f"INSERT INTO prices({cols}) VALUES ({marks})", _sql_rows(prices_df))
+            else:
+                print("[WARN] No FK-valid price rows to insert.")
+    finally:
+        con.close()
 
 # ---------- manifest ----------
 def write_manifest(run_id: str, weekly: Path, master: Path, rows: int, inputs: Dict[str, Any]) -> Path:
@@ -432,7 +612,7 @@ def write_manifest(run_id: str, weekly: Path, master: Path, rows: int, inputs: D
         "settings": {"phase": "real","bounds_eur_per_l": [1,200]},
     }
     out = MANIFESTS / f"run_{run_id}.json"
-    out.write_text(json.dumps(m, indent=2), encoding="utf-8")
+    out.write_bytes(json_dumps_pretty(m))
     return out
 
 # ---------- main ----------
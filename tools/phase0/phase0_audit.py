@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 # tools/phase0/phase0_audit.py
 from __future__ import annotations
-import json, sys
+import json, mmap, sys
 from pathlib import Path
-import pandas as pd
 from hashlib import sha256
+from typing import List, Optional, Set, Tuple
+from openpyxl import load_workbook
 
 CANON_COLS = [
     "run_id","country","chain","retailer_code","website_id","site_domain","robots_status","mode",
@@ -16,10 +17,35 @@ REQ_SHEETS = ["All_Data","Coverage","Pivots_Country_Chain","Changes","QA","Suspe
 def hash_file(p: Path) -> str:
     h = sha256()
     with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
+        try:
+            # whole file in one update over the page cache
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        except (ValueError, OSError):  # empty or unmappable file
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
     return h.hexdigest()
 
+def workbook_info(p: Path, null_col: Optional[str] = None) -> Tuple[Set[str], List[str], bool]:
+    """(sheet names, All_Data header, null_col has an empty All_Data cell).
+    Streams with openpyxl read_only: only the header row and, if asked, that
+    one column are read; no sheet is parsed into a frame."""
+    wb = load_workbook(p, read_only=True, data_only=True)
+    try:
+        names = set(wb.sheetnames)
+        if "All_Data" not in names:
+            return names, [], False
+        ws = wb["All_Data"]
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+        cols = [str(c) for c in header if c is not None]
+        has_null = False
+        if null_col in cols:
+            i = list(header).index(null_col) + 1
+            has_null = any(v is None or v == "" for (v,) in ws.iter_rows(min_row=2, min_col=i, max_col=i, values_only=True))
+        return names, cols, has_null
+    finally:
+        wb.close()
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python tools/phase0/phase0_audit.py --run-id <RUN_ID>")
@@ -34,25 +60,23 @@ def main():
     if not master.exists(): print(f"[FAIL] Master missing: {master}"); fail += 1
     if fail: sys.exit(fail)
 
-    # sheets
-    w = pd.read_excel(weekly, sheet_name=None)
+    # sheets (names only; All_Data header + website_id column streamed)
+    w_sheets, w_cols, w_null_wid = workbook_info(weekly, null_col="website_id")
     for s in REQ_SHEETS:
-        if s not in w: print(f"[FAIL] Weekly missing sheet: {s}"); fail += 1
+        if s not in w_sheets: print(f"[FAIL] Weekly missing sheet: {s}"); fail += 1
 
-    m = pd.read_excel(master, sheet_name=None)
+    m_sheets, m_cols, _ = workbook_info(master)
     for s in REQ_SHEETS:
-        if s not in m: print(f"[FAIL] Master missing sheet: {s}"); fail += 1
+        if s not in m_sheets: print(f"[FAIL] Master missing sheet: {s}"); fail += 1
 
     # canonical columns
-    w_all = w.get("All_Data", pd.DataFrame())
-    m_all = m.get("All_Data", pd.DataFrame())
-    miss_w = [c for c in CANON_COLS if c not in w_all.columns]
-    miss_m = [c for c in CANON_COLS if c not in m_all.columns]
+    miss_w = [c for c in CANON_COLS if c not in w_cols]
+    miss_m = [c for c in CANON_COLS if c not in m_cols]
     if miss_w: print(f"[FAIL] Weekly All_Data missing cols: {miss_w}"); fail += 1
     if miss_m: print(f"[FAIL] Master All_Data missing cols: {miss_m}"); fail += 1
 
     # website_id presence
-    if "website_id" in w_all.columns and w_all["website_id"].isna().any():
+    if w_null_wid:
         print("[FAIL] website_id contains nulls in Weekly"); fail += 1
 
     # idempotency hashes match manifest (if exists)
@@ -1,12 +1,55 @@
 from __future__ import annotations
-import json, time, random, urllib.parse, urllib.request
+import hashlib, os, time, random, threading, urllib.error, urllib.parse, urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+from datetime import date
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+import lxml.html
+from lxml import etree
 
+from tools.common import json_loads
 from tools.phase1.price_parser import parse_price_to_eur
 from tools.phase1.quantity_parser import parse_quantity
 
+# Raw CDX responses, one file per query and day (a CDX index changes slowly)
+CDX_CACHE_DIR = Path("data/_cdx_cache")
+CDX_CACHE_TTL_S = 24 * 3600
+
+# Snapshot downloads are network-bound: a couple may overlap, but the overall
+# request rate stays polite for web.archive.org (archive_pdp_rescue args /
+# phase1_oilbot --archive-workers / --archive-rps).
+SNAPSHOT_WORKERS = 2
+SNAPSHOT_RPS = 1.0
+# 429 / 503 from web.archive.org: retry with exponential backoff (or Retry-After)
+SNAPSHOT_RETRIES = 3
+SNAPSHOT_BACKOFF_S = 5.0
+
+class _Pacer:
+    """Spaces request starts ~1/rps apart (jittered) across all threads."""
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps
+        self.next = time.monotonic()
+        self.lock = threading.Lock()
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next)
+            self.next = start + self.interval * random.uniform(0.75, 1.5)
+        if start > now:
+            time.sleep(start - now)
+
+# Snapshot HTML is already decoded as UTF-8 (see _fetch_snapshot_html).
+# huge_tree: libxml2 otherwise stops at 256 nested elements and drops the rest
+_HTML = lxml.html.HTMLParser(huge_tree=True)
+_UTF8_HTML = lxml.html.HTMLParser(encoding="utf-8", huge_tree=True)
+# Text nodes as BeautifulSoup's get_text() sees them (no comments/script/style)
+_TEXT_XP = etree.XPath(".//text()[not(parent::script or parent::style)]")
+
+def _node_text(el) -> str:
+    """Equivalent of bs4 get_text(strip=True): stripped pieces, no separator."""
+    return "".join(t.strip() for t in _TEXT_XP(el) if t.strip())
+
 @dataclass
 class ArchiveRow:
     name: str
@@ -14,6 +57,27 @@ class ArchiveRow:
     source_url: str
     snapshot_url: str
 
+def _cdx_fetch(qurl: str) -> Tuple[list, bool]:
+    """CDX JSON rows for qurl and whether they came from the local cache."""
+    key = hashlib.sha1(f"{qurl}|{date.today().isoformat()}".encode("utf-8")).hexdigest()
+    fp = CDX_CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - fp.stat().st_mtime < CDX_CACHE_TTL_S:
+            return json_loads(fp.read_bytes()), True
+    except (OSError, ValueError):  # missing, unreadable or truncated: refetch
+        pass
+    with urllib.request.urlopen(qurl, timeout=20) as resp:
+        raw = resp.read()
+    data = json_loads(raw)
+    try:
+        CDX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = fp.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, fp)
+    except OSError:
+        pass
+    return data, False
+
 def _cdx_query_urls(host: str, path_hints: List[str], limit: int) -> List[Dict[str, str]]:
     """Query Wayback CDX API for PDP-like paths and return [{'original','timestamp'}...]"""
     urls: List[Dict[str, str]] = []
@@ -27,15 +91,14 @@ def _cdx_query_urls(host: str, path_hints: List[str], limit: int) -> List[Dict[s
                 "output": "json",
                 "filter": "statuscode:200",
                 "collapse": "digest",
+                "fl": "timestamp,original",  # only the fields we read: ~1/3 of the bytes to fetch, parse and cache
                 "limit": str(limit * 4)  # overfetch; we'll dedupe and cap below
             })
         )
-        with urllib.request.urlopen(qurl, timeout=20) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-        # First row is header
+        data, cached = _cdx_fetch(qurl)
+        # First row is header; rows are [timestamp, original] (see fl)
         for row in data[1:]:
-            original = row[2]
-            ts = row[1]
+            ts, original = row[0], row[1]
             key = (original, ts)
             if key in seen: 
                 continue
@@ -45,7 +108,8 @@ def _cdx_query_urls(host: str, path_hints: List[str], limit: int) -> List[Dict[s
                 break
         if len(urls) >= limit * 2:
             break
-        time.sleep(random.uniform(0.15, 0.3))  # polite jitter
+        if not cached:
+            time.sleep(random.uniform(0.15, 0.3))  # polite jitter
     # Deduplicate by original, keep the newest snapshot
     by_orig: Dict[str, Dict[str,str]] = {}
     for it in urls:
@@ -56,11 +120,24 @@ def _cdx_query_urls(host: str, path_hints: List[str], limit: int) -> List[Dict[s
     uniq.sort(key=lambda x: x["timestamp"], reverse=True)
     return uniq[:limit]
 
+def _retry_after_s(err: urllib.error.HTTPError, attempt: int) -> float:
+    try:
+        return min(60.0, max(0.0, float(err.headers.get("Retry-After", ""))))
+    except (AttributeError, TypeError, ValueError):  # absent, or an HTTP date
+        return SNAPSHOT_BACKOFF_S * (2 ** attempt) * random.uniform(0.75, 1.25)
+
 def _fetch_snapshot_html(original: str, timestamp: str) -> str:
     snap = f"https://web.archive.org/web/{timestamp}/{original}"
-    with urllib.request.urlopen(snap, timeout=20) as resp:
-        html = resp.read().decode("utf-8", errors="replace")
-    return html
+    attempt = 0
+    while True:
+        try:
+            with urllib.request.urlopen(snap, timeout=20) as resp:
+                return resp.read().decode("utf-8", errors="replace")
+        except urllib.error.HTTPError as e:
+            if e.code not in (429, 503) or attempt >= SNAPSHOT_RETRIES:
+                raise
+            time.sleep(_retry_after_s(e, attempt))
+            attempt += 1
 
 def archive_pdp_rescue(
     category_url: str,
@@ -68,8 +145,11 @@ def archive_pdp_rescue(
     positive_terms: List[str],
     brand_terms: List[str],
     negative_terms: List[str],
+    workers: int = SNAPSHOT_WORKERS,
+    rps: float = SNAPSHOT_RPS,
 ) -> List[ArchiveRow]:
-    """Pull PDP snapshots via CDX and extract name + price (best-effort)."""
+    """Pull PDP snapshots via CDX and extract name + price (best-effort).
+    At most `workers` downloads overlap and starts are paced to ~`rps`."""
     from urllib.parse import urlparse
     parsed = urlparse(category_url)
     host = parsed.netloc or category_url
@@ -77,39 +157,65 @@ def archive_pdp_rescue(
     pdp_hints = ["producten", "product", "p"]
     cdx = _cdx_query_urls(host, pdp_hints, limit=max_items)
     rows: List[ArchiveRow] = []
+    pacer = _Pacer(rps)
 
-    for it in cdx:
-        original, ts = it["original"], it["timestamp"]
+    def fetch(it: Dict[str, str]) -> str:
+        pacer.wait()
+        return _fetch_snapshot_html(it["original"], it["timestamp"])
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        futures = [ex.submit(fetch, it) for it in cdx]
         try:
-            html = _fetch_snapshot_html(original, ts)
-        except Exception:
-            continue
-
-        soup = BeautifulSoup(html, "lxml")
-        # name: prefer h1, fallback title
-        name = ""
-        h1 = soup.find("h1")
-        if h1 and h1.get_text(strip=True):
-            name = h1.get_text(strip=True)
-        elif soup.title and soup.title.get_text(strip=True):
-            name = soup.title.get_text(strip=True)
-        if not name:
-            continue
-
-        price = parse_price_to_eur(html)
-        if price is None:
-            continue
-
-        low = (name + " " + html).lower()
-        if not any(t in low for t in positive_terms) and not any(b in low for b in brand_terms):
-            continue
-        if any(n in low for n in negative_terms):
-            continue
-
-        qty = parse_quantity(name)  # may be None; handled later by caller if needed
-        rows.append(ArchiveRow(name=name, price_eur=price, source_url=original,
-                               snapshot_url=f"https://web.archive.org/web/{ts}/{original}"))
-        time.sleep(random.uniform(0.15, 0.3))
-        if len(rows) >= max_items:
-            break
+            # parse in CDX order (newest first) so the kept rows do not
+            # depend on which download finished first
+            for it, fut in zip(cdx, futures):
+                row = _snapshot_row(it, fut, positive_terms, brand_terms, negative_terms)
+                if row is None:
+                    continue
+                rows.append(row)
+                if len(rows) >= max_items:
+                    break
+        finally:
+            for fut in futures:
+                fut.cancel()
     return rows
+
+def _snapshot_row(it: Dict[str, str], fut, positive_terms: List[str], brand_terms: List[str],
+                  negative_terms: List[str]) -> Optional[ArchiveRow]:
+    """Name + price from one downloaded snapshot, or None if it does not qualify."""
+    original, ts = it["original"], it["timestamp"]
+    try:
+        html = fut.result()
+    except Exception:
+        return None
+
+    # lxml directly: same parser bs4 used here, without its Python node tree
+    try:
+        try:
+            root = lxml.html.document_fromstring(html, parser=_HTML)
+        except ValueError:  # str with an <?xml encoding=...?> declaration
+            root = lxml.html.document_fromstring(html.encode("utf-8"), parser=_UTF8_HTML)
+    except etree.ParserError:  # empty document
+        return None
+    # name: prefer h1, fallback title
+    h1 = root.find(".//h1")
+    name = _node_text(h1) if h1 is not None else ""
+    if not name:
+        title = root.find(".//title")
+        name = _node_text(title) if title is not None else ""
+    if not name:
+        return None
+
+    price = parse_price_to_eur(html)
+    if price is None:
+        return None
+
+    low = (name + " " + html).lower()
+    if not any(t in low for t in positive_terms) and not any(b in low for b in brand_terms):
+        return None
+    if any(n in low for n in negative_terms):
+        return None
+
+    qty = parse_quantity(name)  # may be None; handled later by caller if needed
+    return ArchiveRow(name=name, price_eur=price, source_url=original,
+                      snapshot_url=f"https://web.archive.org/web/{ts}/{original}")
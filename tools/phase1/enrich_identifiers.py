@@ -3,52 +3,99 @@ from __future__ import annotations
 import asyncio
 import json
 import random
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 
-from .parsers_jsonld import extract_ldjson_products
+from .parsers_jsonld import extract_products_from_jsonld
+
+# PDPs are hit on the retailer's own site: keep concurrency low by default
+PDP_WORKERS = 2
 
 async def _sleep_jitter(a_ms=150, b_ms=300):
     await asyncio.sleep(random.uniform(a_ms/1000.0, b_ms/1000.0))
 
-async def enrich_identifiers(context, rows: List[Dict], max_pdp: int = 40) -> int:
+class _AsyncBucket:
+    """Token bucket for page loads, matching a retailer's rate_refill_per_s /
+    rate_capacity (the same model as eopt.net_gateway._Bucket)."""
+    def __init__(self, rps: float, burst: int):
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.rps = rps
+        self.last = time.monotonic()
+        self.lock = asyncio.Lock()
+    async def take(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rps)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rps)
+
+async def _enrich_one(pages: asyncio.Queue, r: Dict, bucket: Optional[_AsyncBucket] = None) -> bool:
+    """Fill r's ean/sku from JSON-LD on its PDP, using a page borrowed from the pool."""
+    page = await pages.get()
+    try:
+        if bucket is not None:
+            await bucket.take()
+        try:
+            await page.goto(r["source_url"], wait_until="domcontentloaded", timeout=30000)
+        except Exception:
+            return False
+        try:
+            html = await page.content()
+            prods = extract_products_from_jsonld(html)
+            # heuristic: pick item with closest name if multiple
+            best = None
+            if prods:
+                # prefer gtin present
+                for p in prods:
+                    if p.get("gtin") or p.get("sku"):
+                        best = p
+                        break
+                best = best or prods[0]
+            if best:
+                if best.get("gtin"):
+                    r["ean"] = best["gtin"]
+                if best.get("sku"):
+                    r["sku"] = best["sku"]
+                return True
+        except Exception:
+            pass
+        return False
+    finally:
+        # jitter per page, so pacing one page does not hold up the others
+        await _sleep_jitter()
+        pages.put_nowait(page)
+
+async def enrich_identifiers(context, rows: List[Dict], max_pdp: int = 40, workers: int = PDP_WORKERS,
+                             rate_refill_per_s: Optional[float] = None, rate_capacity: int = 1) -> int:
     """
     Visit up to max_pdp product URLs lacking identifiers and fill ean/sku
-    from JSON-LD on the PDP. Reuses the same persistent browser context.
+    from JSON-LD on the PDP. Reuses the same persistent browser context,
+    with up to `workers` pages loading at once. Pass the retailer's
+    rate_refill_per_s / rate_capacity (retailers.csv) to keep page loads
+    within its politeness budget.
     """
     todo = [r for r in rows if (not r.get("ean") and not r.get("sku")) and r.get("source_url")]
     todo = todo[:max_pdp]
     if not todo:
         return 0
-    page = await context.new_page()
-    enriched = 0
+    # the pool bounds concurrency: a visit waits until a page is free
+    pages: asyncio.Queue = asyncio.Queue()
+    bucket = _AsyncBucket(rate_refill_per_s, rate_capacity) if rate_refill_per_s else None
+    opened = []
     try:
-        for r in todo:
-            url = r["source_url"]
-            try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            except Exception:
-                continue
-            try:
-                html = await page.content()
-                prods = extract_ldjson_products(html)
-                # heuristic: pick item with closest name if multiple
-                best = None
-                if prods:
-                    # prefer gtin present
-                    for p in prods:
-                        if p.get("gtin") or p.get("sku"):
-                            best = p
-                            break
-                    best = best or prods[0]
-                if best:
-                    if best.get("gtin"):
-                        r["ean"] = best["gtin"]
-                    if best.get("sku"):
-                        r["sku"] = best["sku"]
-                    enriched += 1
-            except Exception:
-                pass
-            await _sleep_jitter()
+        for _ in range(max(1, min(workers, len(todo)))):
+            page = await context.new_page()
+            opened.append(page)
+            pages.put_nowait(page)
+        # visits start in row order: gather schedules them in order and the
+        # queue hands out free pages first come, first served
+        done = await asyncio.gather(*(_enrich_one(pages, r, bucket) for r in todo))
     finally:
-        await page.close()
-    return enriched
+        for page in opened:
+            await page.close()
+    return sum(done)
@@ -2,7 +2,32 @@ from __future__ import annotations
 import json
 import re
 from typing import Any, Dict, List, Optional
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+
+# compiled once at import; these run for every product on every page
+_QTY_SINGLE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(ml|l|L)\b", re.I)
+_QTY_PACK = re.compile(r"(\d+)\s*[x×]\s*(\d+(?:[.,]\d+)?)\s*(ml|l|L)\b", re.I)
+_DATALAYER_RX = re.compile(r"dataLayer\s*=\s*(\[[\s\S]*?\]);")
+
+# huge_tree: libxml2 otherwise stops at 256 nested elements and silently drops
+# everything after (bs4's parser builds the tree without that cap)
+_HTML = lxml.html.HTMLParser(huge_tree=True)
+_UTF8_HTML = lxml.html.HTMLParser(encoding="utf-8", huge_tree=True)
+_LDJSON_XP = etree.XPath('//script[@type="application/ld+json"]')
+_NEXT_DATA_XP = etree.XPath('//script[@id="__NEXT_DATA__"]')
+
+
+def _html_root(html: str):
+    """lxml tree of html (the tree BeautifulSoup(html, "lxml") wraps), or None
+    for a document lxml cannot parse (e.g. whitespace only)."""
+    try:
+        try:
+            return lxml.html.document_fromstring(html, parser=_HTML)
+        except ValueError:  # str with an <?xml encoding=...?> declaration
+            return lxml.html.document_fromstring(html.encode("utf-8"), parser=_UTF8_HTML)
+    except etree.ParserError:
+        return None
 
 
 def _first_offer(offers: Any) -> Dict[str, Any]:
@@ -13,11 +38,11 @@ def _first_offer(offers: Any) -> Dict[str, Any]:
 
 def _qty_hint_from_text(*texts: str) -> Optional[str]:
     blob = " ".join([t for t in texts if t]) or ""
-    m = re.search(r"(\d+(?:[.,]\d+)?)\s*(ml|l|L)\b", blob, re.I)
+    m = _QTY_SINGLE.search(blob)
     if m:
         return f"{m.group(1)} {m.group(2)}"
     # packs like 2x1 L, 4 × 250 ml
-    m2 = re.search(r"(\d+)\s*[x×]\s*(\d+(?:[.,]\d+)?)\s*(ml|l|L)\b", blob, re.I)
+    m2 = _QTY_PACK.search(blob)
     if m2:
         return f"{m2.group(1)}x{m2.group(2)} {m2.group(3)}"
     return None
@@ -31,9 +56,11 @@ def extract_products_from_jsonld(html: str) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     if not html:
         return out
-    soup = BeautifulSoup(html, "lxml")
-    for tag in soup.find_all("script", attrs={"type": "application/ld+json"}):
-        text = tag.string or tag.get_text() or ""
+    root = _html_root(html)
+    if root is None:
+        return out
+    for tag in _LDJSON_XP(root):
+        text = tag.text or ""
         try:
             data = json.loads(text)
         except Exception:
@@ -78,12 +105,12 @@ def extract_next_products(html: str) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     if not html:
         return out
-    soup = BeautifulSoup(html, "lxml")
-    tag = soup.find("script", id="__NEXT_DATA__")
-    if not tag:
+    root = _html_root(html)
+    tags = _NEXT_DATA_XP(root) if root is not None else []
+    if not tags:
         return out
     try:
-        data = json.loads(tag.text)
+        data = json.loads(tags[0].text or "")
     except Exception:
         return out
 
@@ -129,8 +156,7 @@ def extract_next_products(html: str) -> List[Dict[str, Any]]:
 def extract_datalayer_products(html: str):
     out = []
     try:
-        import re, json
-        m = re.search(r"dataLayer\s*=\s*(\[[\s\S]*?\]);", html)
+        m = _DATALAYER_RX.search(html)
         if not m:
             return out
         dl = json.loads(m.group(1))
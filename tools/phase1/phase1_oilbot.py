@@ -41,7 +41,8 @@ from tools.phase1.price_parser import parse_price_to_eur
 from tools.phase1.quantity_parser import parse_quantity
 from tools.phase1 import detectors
 from tools.phase1.exporters import Row, write_rows_csv, write_run_health, merge_final_export
-from tools.phase1.archive_backends import archive_pdp_rescue
+from tools.phase1.archive_backends import SNAPSHOT_RPS, SNAPSHOT_WORKERS, archive_pdp_rescue
+from tools.common import xpath_literal
 
 # ---- optional archive HTML orchestrator
 try:
@@ -716,27 +717,23 @@ def _ensure_store_selected(
             page.click(open_selector)
     except Exception:
         pass
+    # One XPath union per lookup (single browser round-trip); the innermost match wins so
+    # a wrapping <div> never shadows the actual option.
+    lit = xpath_literal(store_name)
     try:
         inp = page.query_selector('input[role="combobox"], input[type="search"], input[type="text"]')
         if inp:
             inp.fill(store_name)
             page.wait_for_timeout(500)
-            opt = (
-                page.query_selector(f'//li[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//div[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//button[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//a[contains(normalize-space(.), "{store_name}")]')
-            )
-            if opt:
-                opt.click()
+            tags = "self::li or self::div or self::button or self::a"
         else:
-            opt = (
-                page.query_selector(f'//button[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//a[contains(normalize-space(.), "{store_name}")]')
-                or page.query_selector(f'//div[contains(normalize-space(.), "{store_name}")]')
-            )
-            if opt:
-                opt.click()
+            tags = "self::button or self::a or self::div"
+        opt = page.query_selector(
+            f"xpath=//*[{tags}][contains(normalize-space(.), {lit})]"
+            f"[not(.//*[{tags}][contains(normalize-space(.), {lit})])]"
+        )
+        if opt:
+            opt.click()
 
         if confirm_selector:
             page.click(confirm_selector, timeout=timeout_ms)
@@ -790,7 +787,8 @@ def _archive_listing_attempt(ret: Retailer, target_url: str, run_dir: Path, max_
 # -------------------------
 # Main runner for one retailer
 # -------------------------
-def run_one(ret: Retailer, run_id: str, root: Path, *, archive_first: bool = False, live_only: bool = False) -> Dict[str, Any]:
+def run_one(ret: Retailer, run_id: str, root: Path, *, archive_first: bool = False, live_only: bool = False,
+            archive_workers: int = SNAPSHOT_WORKERS, archive_rps: float = SNAPSHOT_RPS) -> Dict[str, Any]:
     run_dir = root / f"logs/run_{run_id}/{ret.code}"
     run_dir.mkdir(parents=True, exist_ok=True)
 
@@ -1126,6 +1124,8 @@ def run_one(ret: Retailer, run_id: str, root: Path, *, archive_first: bool = Fal
                 positive_terms=terms["positive"],
                 brand_terms=terms["brands"],
                 negative_terms=[n.lower() for n in DEFAULT_NEGATIVE_TERMS],
+                workers=archive_workers,
+                rps=archive_rps,
             )
             for r in arch_rows:
                 qty = parse_quantity(r.name) or ""
@@ -1245,6 +1245,8 @@ def main():
     ap.add_argument("--targets", default="", help="comma-separated retailer codes (optional)")
     ap.add_argument("--archive-first", action="store_true", help="Prefer archives for listing first, then live as needed")
     ap.add_argument("--live-only", action="store_true", help="Disable archive listing/PDP fallbacks")
+    ap.add_argument("--archive-workers", type=int, default=SNAPSHOT_WORKERS, help="Concurrent Wayback snapshot downloads")
+    ap.add_argument("--archive-rps", type=float, default=SNAPSHOT_RPS, help="Wayback snapshot requests per second")
     args = ap.parse_args()
 
     root = Path(".").resolve()
@@ -1254,7 +1256,8 @@ def main():
     all_rows: List[Row] = []
     for ret in rets:
         print(f"[INFO] Running {ret.code}…")
-        result = run_one(ret, args.run_id, root, archive_first=args.archive_first, live_only=args.live_only)
+        result = run_one(ret, args.run_id, root, archive_first=args.archive_first, live_only=args.live_only,
+                         archive_workers=args.archive_workers, archive_rps=args.archive_rps)
         all_rows.extend(result["rows"])
 
     export_path = root / f"exports/oil_prices_{args.run_id}.csv"